@@ -2,6 +2,7 @@ import oci
 import json
 import logging
 import os
+import threading
 import time
 from datetime import datetime
 
@@ -9,6 +10,53 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class WriteRateLimiter:
+    """
+    Token bucket that keeps inserts within the table's provisioned write units,
+    so the poller waits locally instead of being throttled by the service.
+    """
+
+    def __init__(self, units_per_second):
+        self.rate = units_per_second
+        self.tokens = units_per_second
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.throttled = 0
+        self.throttling_errors = 0
+
+    def acquire(self, units=1):
+        """Block until units are available and take them."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= units
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+            if wait:
+                self.throttled += 1
+        if wait:
+            time.sleep(wait)
+
+    def adjust(self, units):
+        """Take (or return) the difference between the consumed and reserved units."""
+        with self.lock:
+            self.tokens = min(self.rate, self.tokens - units)
+
+
+def create_write_rate_limiter(nosql_client, table_ocid):
+    """Size the write limiter from the table limits, falling back to NOSQL_MAX_WRITE_UNITS."""
+    utilization = float(os.environ.get("NOSQL_RATE_LIMIT_UTILIZATION", "0.9"))
+    write_units = float(os.environ.get("NOSQL_MAX_WRITE_UNITS", "50"))
+    try:
+        table_limits = nosql_client.get_table(table_name_or_id=table_ocid).data.table_limits
+        if table_limits and table_limits.max_write_units:
+            write_units = table_limits.max_write_units
+    except oci.exceptions.ServiceError as e:
+        logger.warning(f"Could not read table limits for {table_ocid}, using {write_units} write units: {e.message}")
+    logger.info(f"Limiting inserts to {write_units * utilization} write units per second")
+    return WriteRateLimiter(write_units * utilization)
+
+
 def poll_queue_and_insert_to_nosql():
     """
     Polls an OCI Queue and inserts messages into a NoSQL table using Resource Principal authentication.
@@ -48,6 +96,8 @@ def poll_queue_and_insert_to_nosql():
             signer=signer
         )
         
+        write_limiter = create_write_rate_limiter(nosql_client, table_ocid)
+        
         # Verify queue existence
         try:
             # pylint: disable=no-member
@@ -108,10 +158,14 @@ def poll_queue_and_insert_to_nosql():
                             value=record,
                             option="IF_ABSENT"  # Only insert if the row doesn't exist
                         )
+                        write_limiter.acquire()
                         nosql_response = nosql_client.update_row(
                             table_name_or_id=table_ocid,
                             update_row_details=update_row_details
                         )
+                        usage = getattr(nosql_response.data, "usage", None)
+                        if usage and usage.write_units_consumed is not None:
+                            write_limiter.adjust(usage.write_units_consumed - 1)
                         
                         if nosql_response.status == 200:
                             logger.info(f"Successfully inserted record into table {table_ocid} for message {message.id}")
@@ -125,9 +179,13 @@ def poll_queue_and_insert_to_nosql():
                         else:
                             logger.error(f"Failed to insert record into table {table_ocid} for message {message.id}: {nosql_response.status}")
                     except oci.exceptions.ServiceError as e:
+                        if e.status == 429:
+                            write_limiter.throttling_errors += 1
                         logger.error(f"NoSQL error for message {message.id}: {e.message}, Status: {e.status}, Code: {e.code}, Request ID: {e.request_id}")
                         continue
                 
+                logger.info(f"Rate limiter metrics: throttled_locally={write_limiter.throttled}, throttling_errors={write_limiter.throttling_errors}")
+                
                 # Sleep briefly to avoid overwhelming the queue
                 time.sleep(1)
                 
@@ -5,7 +5,17 @@ from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from dotenv import load_dotenv
 import asyncio
+import contextvars
+import hashlib
+import json
 import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from langchain_core.tools import StructuredTool
+from langchain_core.messages import ToolMessage
+from langchain_community.embeddings import OCIGenAIEmbeddings
 from langchain_mcp_adapters.tools import load_mcp_tools
 from langgraph.prebuilt import create_react_agent
 from langchain_community.chat_models.oci_generative_ai import ChatOCIGenAI
@@ -22,74 +32,407 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize LLM
-logger.info("Initializing OCI Generative AI model")
 load_dotenv()
-try:
-    llm = ChatOCIGenAI(
-        model_id=os.getenv("MODEL_ID"),
+
+# How long the MCP tool list is trusted before it is fetched again
+TOOLS_CACHE_TTL_SECONDS = float(os.getenv("TOOLS_CACHE_TTL_SECONDS", "300"))
+# Stream tokens and tool progress to the UI as they arrive
+STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "true").lower() == "true"
+# Read-only tool results are reused within a chat session for this long
+TOOL_MEMO_TTL_SECONDS = float(os.getenv("TOOL_MEMO_TTL_SECONDS", "120"))
+# Tools with side effects, whose results are never reused
+MEMOIZE_EXCLUDED_TOOLS = {
+    name.strip() for name in os.getenv(
+        "MEMOIZE_EXCLUDED_TOOLS", "initiate_refund_for_order_id,initiate_refunds_for_order_ids"
+    ).split(",") if name.strip()
+}
+
+# Optional cache of final answers to repeated questions
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+RESPONSE_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("RESPONSE_CACHE_SIMILARITY_THRESHOLD", "0.92"))
+# Embedding model for the similarity tier; only exact matches are served when unset
+EMBEDDING_MODEL_ID = os.getenv("EMBEDDING_MODEL_ID")
+
+# Chat session of the message being processed, set by chat_interface
+current_session = contextvars.ContextVar("current_session", default=None)
+
+def create_llm():
+    """Initialize the OCI Generative AI chat model from environment variables"""
+    logger.info("Initializing OCI Generative AI model")
+    try:
+        llm = ChatOCIGenAI(
+            model_id=os.getenv("MODEL_ID"),
+            service_endpoint=os.getenv("SERVICE_ENDPOINT"),
+            compartment_id=os.getenv("COMPARTMENT_ID"),
+            model_kwargs={
+                "temperature": float(os.getenv("MODEL_TEMPERATURE")),
+                "max_tokens": int(os.getenv("MODEL_MAX_TOKENS"))
+            },
+            auth_type=os.getenv("AUTH_TYPE"),
+            auth_profile=os.getenv("AUTH_PROFILE"),
+            provider=os.getenv("PROVIDER"),
+        )
+        logger.info("LLM initialized successfully")
+        return llm
+    except Exception as e:
+        logger.error(f"Failed to initialize LLM: {str(e)}")
+        raise
+
+def create_mcp_client():
+    """Initialize the MCP client for the tools server at MCP_URL"""
+    logger.info("Initializing MultiServerMCPClient")
+    try:
+        mcp_url = os.getenv("MCP_URL")
+        client = MultiServerMCPClient(
+            {
+                "tools_server": {
+                    "transport": "streamable_http",
+                    "url": mcp_url,
+                    "timeout": 30.0,
+                },
+            }
+        )
+        logger.info("Client initialized successfully")
+        return client
+    except Exception as e:
+        logger.error(f"Failed to initialize client: {str(e)}")
+        raise
+
+class SessionToolMemo:
+    """Per-session cache of tool results keyed by tool name and arguments"""
+
+    def __init__(self, ttl_seconds=TOOL_MEMO_TTL_SECONDS, max_sessions=1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id, key):
+        entries = self.sessions.get(session_id)
+        entry = entries.get(key) if entries else None
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def set(self, session_id, key, result):
+        entries = self.sessions.setdefault(session_id, {})
+        self.sessions.move_to_end(session_id)
+        entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+
+tool_memo = SessionToolMemo()
+
+def memoize_tool(tool, memo):
+    """Wrap a tool so repeated calls with the same arguments in one session reuse the first result"""
+    async def call(**kwargs):
+        session_id = current_session.get()
+        if session_id is None:
+            return await tool.coroutine(**kwargs)
+        key = (tool.name, json.dumps(kwargs, sort_keys=True, default=str))
+        result = memo.get(session_id, key)
+        if result is not None:
+            logger.debug(f"Reusing result of {tool.name} for session {session_id}")
+            return result
+        result = await tool.coroutine(**kwargs)
+        memo.set(session_id, key, result)
+        return result
+
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        coroutine=call,
+        response_format=tool.response_format,
+        metadata=tool.metadata,
+    )
+
+def memoize_tools(tools, memo=None):
+    """Wrap every read-only tool with session-scoped memoization"""
+    memo = memo or tool_memo
+    return [tool if tool.name in MEMOIZE_EXCLUDED_TOOLS else memoize_tool(tool, memo) for tool in tools]
+
+# Messages that mention customer-specific data are always answered live
+PERSONAL_DATA_PATTERN = re.compile(r"\S+@\S+|\bCUST\d+\b|\d{4,}|[0-9a-f]{8}-[0-9a-f]{4}-", re.IGNORECASE)
+
+def normalize_message(message):
+    """Lowercase and collapse whitespace so trivially different questions match exactly"""
+    return " ".join(str(message).lower().split())
+
+def cosine_similarity(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+def create_embeddings():
+    """Initialize the OCI Generative AI embedding model used for similar-question matching"""
+    logger.info("Initializing OCI Generative AI embeddings")
+    return OCIGenAIEmbeddings(
+        model_id=EMBEDDING_MODEL_ID,
         service_endpoint=os.getenv("SERVICE_ENDPOINT"),
         compartment_id=os.getenv("COMPARTMENT_ID"),
-        model_kwargs={
-            "temperature": float(os.getenv("MODEL_TEMPERATURE")),
-            "max_tokens": int(os.getenv("MODEL_MAX_TOKENS"))
-        },
         auth_type=os.getenv("AUTH_TYPE"),
         auth_profile=os.getenv("AUTH_PROFILE"),
-        provider=os.getenv("PROVIDER"),
     )
-    logger.info("LLM initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize LLM: {str(e)}")
-    raise
-
-# Initialize client
-logger.info("Initializing MultiServerMCPClient")
-try:
-    mcp_url = os.getenv("MCP_URL")
-    client = MultiServerMCPClient(
-        {
-            "tools_server": {
-                "transport": "streamable_http",
-                "url": mcp_url,
-                "timeout": 30.0,
-            },
-        }
-    )
-    logger.info("Client initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize client: {str(e)}")
-    raise
 
-async def get_agent_response(message, history):
+class ResponseCache:
+    """
+    Two-tier cache of agent answers.
+
+    The exact tier matches normalized message text. The similarity tier, used
+    when an embedding model is configured, returns the answer of the most
+    similar cached question if its cosine similarity reaches the threshold.
+    Entries expire after a TTL and the least recently used entry is evicted
+    once the cache is full. Answers that needed tool calls, errors and
+    messages mentioning customer data are never cached.
+    """
+
+    def __init__(self, embeddings_factory=None, max_entries=RESPONSE_CACHE_SIZE,
+                 ttl_seconds=RESPONSE_CACHE_TTL_SECONDS, threshold=RESPONSE_CACHE_SIMILARITY_THRESHOLD):
+        self.embeddings_factory = embeddings_factory
+        self.embeddings = None
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.entries = OrderedDict()
+        self.stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0, "bypassed": 0}
+
+    def is_cacheable(self, message):
+        return not PERSONAL_DATA_PATTERN.search(str(message))
+
+    async def embed(self, text):
+        if self.embeddings_factory is None:
+            return None
+        try:
+            if self.embeddings is None:
+                self.embeddings = self.embeddings_factory()
+            return await self.embeddings.aembed_query(text)
+        except Exception as e:
+            logger.warning(f"Embedding failed, using exact matching only: {str(e)}")
+            return None
+
+    def evict_expired(self):
+        now = time.monotonic()
+        for key in [key for key, entry in self.entries.items() if entry["expires_at"] < now]:
+            del self.entries[key]
+
+    async def lookup(self, message):
+        """Return (answer, embedding); answer is None on a miss"""
+        if not self.is_cacheable(message):
+            self.stats["bypassed"] += 1
+            return None, None
+        self.evict_expired()
+        key = normalize_message(message)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.stats["exact_hits"] += 1
+            logger.info("Response served from exact-match cache")
+            return entry["answer"], entry["embedding"]
+
+        embedding = await self.embed(key)
+        if embedding is not None:
+            best_key, best_score = None, 0.0
+            for cached_key, cached in self.entries.items():
+                if cached["embedding"] is not None:
+                    score = cosine_similarity(embedding, cached["embedding"])
+                    if score > best_score:
+                        best_key, best_score = cached_key, score
+            if best_key is not None and best_score >= self.threshold:
+                self.entries.move_to_end(best_key)
+                self.stats["similar_hits"] += 1
+                logger.info(f"Response served from similarity cache (score {best_score:.3f})")
+                return self.entries[best_key]["answer"], embedding
+        self.stats["misses"] += 1
+        return None, embedding
+
+    def store(self, message, answer, embedding=None, used_tools=False):
+        """Cache an answer unless it depended on tool calls or failed"""
+        if used_tools or not answer or answer.startswith("Error processing request") or not self.is_cacheable(message):
+            return
+        key = normalize_message(message)
+        self.entries[key] = {"answer": answer, "embedding": embedding, "expires_at": time.monotonic() + self.ttl_seconds}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+response_cache = ResponseCache(create_embeddings if EMBEDDING_MODEL_ID else None) if RESPONSE_CACHE_ENABLED else None
+
+def tools_signature(tools):
+    """Return a hash identifying the names, descriptions and arguments of the tools"""
+    described = sorted((tool.name, tool.description, json.dumps(tool.args, sort_keys=True, default=str)) for tool in tools)
+    return hashlib.sha256(json.dumps(described).encode("utf-8")).hexdigest()
+
+class AgentCache:
+    """
+    Keeps the MCP tool list and the compiled ReAct agent for the process lifetime.
+
+    The tool list is fetched again once the TTL expires, and the agent is only
+    rebuilt when the fetched tools differ from the ones it was built with.
+    """
+
+    def __init__(self, llm_factory, client_factory, ttl_seconds=TOOLS_CACHE_TTL_SECONDS):
+        self.llm_factory = llm_factory
+        self.client_factory = client_factory
+        self.ttl_seconds = ttl_seconds
+        self.llm = None
+        self.client = None
+        self.tools = None
+        self.agent = None
+        self.signature = None
+        self.fetched_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def is_fresh(self):
+        return self.agent is not None and time.monotonic() - self.fetched_at < self.ttl_seconds
+
+    async def get_agent(self):
+        """Return the cached agent, refreshing the tool list if the TTL has expired"""
+        if self.is_fresh():
+            return self.agent
+        async with self.lock:
+            if self.is_fresh():
+                return self.agent
+            if self.llm is None:
+                self.llm = self.llm_factory()
+            if self.client is None:
+                self.client = self.client_factory()
+
+            logger.debug("Fetching tools from client")
+            tools = await self.client.get_tools()
+            logger.debug(f"Retrieved {len(tools)} tools")
+            signature = tools_signature(tools)
+            if signature != self.signature:
+                logger.info(f"Tool list changed, creating react agent with {len(tools)} tools")
+                self.tools = tools
+                self.agent = create_react_agent(self.llm, memoize_tools(tools))
+                self.signature = signature
+            self.fetched_at = time.monotonic()
+            return self.agent
+
+    def invalidate(self):
+        """Force the tool list to be fetched again on the next request"""
+        self.fetched_at = 0.0
+
+agent_cache = AgentCache(create_llm, create_mcp_client)
+
+async def warm_up():
+    """Prefetch the tools and build the agent so the first message does not pay for it"""
+    logger.info("Warming up agent")
+    try:
+        await agent_cache.get_agent()
+        logger.info("Agent warm-up completed")
+    except Exception as e:
+        logger.warning(f"Agent warm-up failed, will retry on first message: {str(e)}")
+
+async def get_agent_response(message, history, cache=None, responses=None):
     """Process user message and return agent response"""
+    cache = cache or agent_cache
+    responses = responses or response_cache
     logger.info(f"Processing message: {message}")
     try:
-        logger.debug("Fetching tools from client")
-        tools = await client.get_tools()
-        logger.debug(f"Retrieved {len(tools)} tools")
-        
-        logger.debug("Creating react agent")
-        agent = create_react_agent(llm, tools)
+        embedding = None
+        if responses is not None:
+            cached, embedding = await responses.lookup(message)
+            if cached is not None:
+                return cached
+
+        agent = await cache.get_agent()
 
         logger.debug("Invoking agent")
         response = await agent.ainvoke({"messages": message})
         
         logger.info("Agent response generated successfully")
-        return response['messages'][-1].content if isinstance(response['messages'], list) else str(response)
+        if not isinstance(response['messages'], list):
+            return str(response)
+        answer = response['messages'][-1].content
+        if responses is not None:
+            used_tools = any(isinstance(m, ToolMessage) for m in response['messages'])
+            responses.store(message, answer, embedding, used_tools)
+        return answer
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        # The server's tools may have changed; fetch them again next time.
+        cache.invalidate()
         return f"Error processing request: {str(e)}"
 
-async def chat_interface(message, history):
+def render_progress(tool_progress, answer):
+    """Format tool progress lines above the partial answer"""
+    lines = [f"_{line}_" for line in tool_progress]
+    return "\n\n".join(lines + ([answer] if answer else []))
+
+async def stream_agent_response(message, history, cache=None, responses=None):
+    """Process user message and yield the agent response as it is generated"""
+    cache = cache or agent_cache
+    responses = responses or response_cache
+    logger.info(f"Streaming response for message: {message}")
+    try:
+        embedding = None
+        if responses is not None:
+            cached, embedding = await responses.lookup(message)
+            if cached is not None:
+                yield cached
+                return
+
+        agent = await cache.get_agent()
+
+        tool_progress = []
+        answer = ""
+        logger.debug("Streaming agent events")
+        async for event in agent.astream_events({"messages": message}, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if isinstance(content, str) and content:
+                    answer += content
+                    yield render_progress(tool_progress, answer)
+            elif kind == "on_chat_model_end":
+                # Text generated alongside tool calls is not the final answer.
+                output = event["data"].get("output")
+                if getattr(output, "tool_calls", None):
+                    answer = ""
+                elif isinstance(getattr(output, "content", None), str) and output.content:
+                    # Models that do not stream tokens only deliver the message here.
+                    answer = output.content
+            elif kind == "on_tool_start":
+                tool_progress.append(f"Calling tool {event['name']}...")
+                yield render_progress(tool_progress, answer)
+            elif kind == "on_tool_end":
+                started = f"Calling tool {event['name']}..."
+                if started in tool_progress:
+                    tool_progress[tool_progress.index(started)] = f"Called tool {event['name']}"
+                yield render_progress(tool_progress, answer)
+
+        logger.info("Agent response streamed successfully")
+        if responses is not None:
+            responses.store(message, answer, embedding, used_tools=bool(tool_progress))
+        yield answer
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        # The server's tools may have changed; fetch them again next time.
+        cache.invalidate()
+        yield f"Error processing request: {str(e)}"
+
+async def chat_interface(message, history, request: gr.Request = None):
     """Gradio async chat interface function"""
     logger.debug(f"Chat interface received message: {message}")
+    current_session.set(request.session_hash if request else None)
+    if STREAMING_ENABLED:
+        async for partial in stream_agent_response(message, history):
+            yield partial
+        return
     response = await get_agent_response(message, history)
     logger.debug(f"Chat interface returning response: {response}")
-    return response
+    yield response
 
 def main():
     """Create and launch Gradio UI"""
+    asyncio.run(warm_up())
     logger.info("Starting Gradio UI")
     try:
         interface = gr.ChatInterface(
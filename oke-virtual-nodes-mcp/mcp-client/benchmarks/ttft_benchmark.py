@@ -0,0 +1,152 @@
+"""
+Time-to-first-token benchmark for the agent client.
+
+Starts a fake MCP server (one tool with configurable latency) on localhost
+and drives the agent with a fake streaming chat model that first calls the
+tool and then streams its answer word by word. Compares, per message:
+  blocking  - get_agent_response: time until the full answer is available
+  streaming - stream_agent_response: time to the first UI update, the first
+              answer token and the complete answer
+
+Usage:
+    python benchmarks/ttft_benchmark.py --runs 5 --tool-latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import uvicorn  # noqa: E402
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult  # noqa: E402
+from langchain_mcp_adapters.client import MultiServerMCPClient  # noqa: E402
+from mcp.server.fastmcp import FastMCP  # noqa: E402
+
+from app import AgentCache, get_agent_response, stream_agent_response  # noqa: E402
+
+ANSWER = ("The customer ID for john@example.com is CUST01. "
+          "Let me know if you would like to see the open orders for this customer as well.")
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """Calls get_customer_id once, then answers; streams the answer word by word."""
+
+    first_token_delay: float = 0.4
+    token_delay: float = 0.03
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_message(self, messages) -> AIMessage:
+        if not any(isinstance(message, ToolMessage) for message in messages):
+            return AIMessage(content="", tool_calls=[
+                {"name": "get_customer_id", "args": {"email": "john@example.com"}, "id": "call_1"}])
+        return AIMessage(content=ANSWER)
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._next_message(messages)
+        time.sleep(self.first_token_delay + self.token_delay * len(message.content.split()))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._next_message(messages)
+        await asyncio.sleep(self.first_token_delay + self.token_delay * len(message.content.split()))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any):
+        message = self._next_message(messages)
+        await asyncio.sleep(self.first_token_delay)
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}]))
+            return
+        for i, word in enumerate(message.content.split(" ")):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def start_fake_mcp_server(tool_latency: float) -> str:
+    """Serve a fake MCP tools server over streamable HTTP in a background thread and return its URL."""
+    server = FastMCP("fake-tools")
+
+    @server.tool()
+    async def get_customer_id(email: str) -> str:
+        """Get customer ID based on email."""
+        await asyncio.sleep(tool_latency)
+        return json.dumps({"success": True, "customerId": "CUST01"})
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.streamable_http_app(), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=uvicorn_server.run, daemon=True).start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/mcp/"
+
+
+async def measure_blocking(cache: AgentCache, message: str) -> float:
+    started = time.perf_counter()
+    await get_agent_response(message, [], cache=cache)
+    return time.perf_counter() - started
+
+
+async def measure_streaming(cache: AgentCache, message: str) -> dict:
+    started = time.perf_counter()
+    first_update = first_token = None
+    async for partial in stream_agent_response(message, [], cache=cache):
+        now = time.perf_counter() - started
+        if first_update is None:
+            first_update = now
+        if first_token is None and ANSWER.split()[0] in partial:
+            first_token = now
+    return {"first_update": first_update, "first_token": first_token, "complete": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tool-latency", type=float, default=0.3)
+    parser.add_argument("--first-token-delay", type=float, default=0.4)
+    parser.add_argument("--token-delay", type=float, default=0.03)
+    args = parser.parse_args()
+
+    url = start_fake_mcp_server(args.tool_latency)
+    llm = FakeStreamingChatModel(first_token_delay=args.first_token_delay, token_delay=args.token_delay)
+    cache = AgentCache(lambda: llm, lambda: MultiServerMCPClient(
+        {"tools_server": {"transport": "streamable_http", "url": url, "timeout": 30.0}}))
+    message = "What is the customer ID for john@example.com?"
+
+    async def run():
+        await cache.get_agent()
+        blocking = [await measure_blocking(cache, message) for _ in range(args.runs)]
+        streaming = [await measure_streaming(cache, message) for _ in range(args.runs)]
+        median = statistics.median
+        print(f"blocking  full response:    {median(blocking) * 1000:8.1f} ms")
+        print(f"streaming first update:     {median(r['first_update'] for r in streaming) * 1000:8.1f} ms")
+        print(f"streaming first token:      {median(r['first_token'] for r in streaming) * 1000:8.1f} ms")
+        print(f"streaming full response:    {median(r['complete'] for r in streaming) * 1000:8.1f} ms")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
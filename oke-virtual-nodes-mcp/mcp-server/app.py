@@ -1,12 +1,20 @@
 import os
-from fastmcp import FastMCP
-from tools.text_analysis import analyze_text
-from tools.classify_document import classify_document
-from tools.nosql_client import get_customer_by_email, get_customer_id_by_email, seed_customer_info_table, seed_order_info_table, get_open_orders
+from fastmcp import FastMCP, Context
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from tools.text_analysis import analyze_text, analyze_texts, is_long_text, iter_analyze_long_text, get_ai_client as get_language_client
+from typing import List
+from tools.classify_document import classify_document, classify_documents, get_ai_client as get_document_client
+from tools.nosql_client import get_customer_by_email, get_customer_id_by_email, seed_customer_info_table, seed_order_info_table, get_open_orders, get_table_stats, start_table_stats_refresh, warm_up_nosql_client
 import json
 from starlette.requests import Request
-from starlette.responses import PlainTextResponse
-from tools.notification_client import issue_refund_for_order
+from starlette.responses import JSONResponse
+from tools.notification_client import issue_refund_for_order, issue_refunds_for_orders, get_refund_outbox, get_notification_client
+from tools.executors import run_blocking, run_coalesced, iterate_blocking, bulkhead_usage
+from tools.circuit_breaker import breaker_states
+from tools.startup import Startup, warm_signer
+from tools.document_ingest import get_document_store
+from tools import metrics
+from tools.tracing import span, payload_size, content_size
 
 APP_NAME = os.getenv("FASTMCP_APP_NAME", "fastmcp-demo")
 PORT = int(os.getenv("FASTMCP_PORT", "8080"))
@@ -15,10 +23,27 @@ HOST = os.getenv("FASTMCP_HOST", "0.0.0.0")
 
 mcp = FastMCP(APP_NAME)
 
+
+class ToolTracingMiddleware(Middleware):
+    """Records a span for every tool invocation, the parent of the OCI SDK calls it makes."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool_name = context.message.name
+        with span(tool_name, "tool", request_bytes=payload_size(context.message.arguments)) as current:
+            result = await call_next(context)
+            current.attributes["response_bytes"] = content_size(result)
+            if getattr(result, "is_error", False):
+                current.error = "Tool returned an error"
+                metrics.increment(f"tool.{tool_name}.errors")
+            return result
+
+
+mcp.add_middleware(ToolTracingMiddleware())
+
 @mcp.tool
-def sentiment_analysis(text: str) -> str:
+async def sentiment_analysis(text: str, ctx: Context) -> str:
     """
-    Analyze the sentiment of the given text.
+    Analyze the sentiment of the given text. Texts of any length are accepted.
 
     Args:
         text (str): The text to analyze
@@ -26,7 +51,17 @@ def sentiment_analysis(text: str) -> str:
     Returns:
         str: A JSON string containing text_classification.label text_classification.score and key phrases
     """
-    result = analyze_text(text)
+    if not is_long_text(text):
+        result = await run_coalesced("language", analyze_text, text)
+    else:
+        # Long texts are analyzed in chunks; report the merged result as chunks complete.
+        result = {}
+        async for result in iterate_blocking("language", iter_analyze_long_text, text):
+            if "error" in result:
+                break
+            await ctx.report_progress(progress=result["chunks_completed"], total=result["chunks_total"])
+            if not result["complete"]:
+                await ctx.info(json.dumps(result))
     # blob = TextBlob(text)
     # sentiment = blob.sentiment
     
@@ -39,6 +74,21 @@ def sentiment_analysis(text: str) -> str:
     return json.dumps(result)
 
 
+@mcp.tool
+async def batch_sentiment_analysis(texts: List[str]) -> str:
+    """
+    Analyze the sentiment of many texts at once, e.g. a day's support tickets.
+
+    Args:
+        texts (List[str]): The texts to analyze
+
+    Returns:
+        str: A JSON string with "results" in input order, each containing index, text_classification.label, text_classification.score and key phrases (or an error)
+    """
+    result = await run_blocking("language", analyze_texts, texts)
+    return json.dumps(result)
+
+
 def get_weather(text: str) -> str:
     """
     Get the current weather of the given city.
@@ -54,7 +104,7 @@ def get_weather(text: str) -> str:
     return json.dumps(result)
 
 @mcp.tool
-def get_customer_info(email: str) -> str:
+async def get_customer_info(email: str) -> str:
     """
     Get customer information based on email.
 
@@ -64,11 +114,11 @@ def get_customer_info(email: str) -> str:
     Returns:
         str: JSON string of customer details
     """
-    result = get_customer_by_email(email)
+    result = await run_coalesced("nosql", get_customer_by_email, email)
     return json.dumps(result)
 
 @mcp.tool
-def get_customer_id(email: str) -> str:
+async def get_customer_id(email: str) -> str:
     """
     Get customer ID based on email.
 
@@ -78,11 +128,11 @@ def get_customer_id(email: str) -> str:
     Returns:
         str: JSON string with customer ID
     """
-    result = get_customer_id_by_email(email)
+    result = await run_coalesced("nosql", get_customer_id_by_email, email)
     return json.dumps(result)
 
 @mcp.tool
-def get_open_orders_by_customer_id(customerId: str) -> str:
+async def get_open_orders_by_customer_id(customerId: str) -> str:
     """
     Get all the open orders for the customerId.
 
@@ -92,11 +142,11 @@ def get_open_orders_by_customer_id(customerId: str) -> str:
     Returns:
         str: JSON string with All open orders
     """
-    result = get_open_orders(customerId)
+    result = await run_coalesced("nosql", get_open_orders, customerId)
     return json.dumps(result)
 
 @mcp.tool
-def initiate_refund_for_order_id(orderId: str) -> str:
+async def initiate_refund_for_order_id(orderId: str) -> str:
     """
     Cancels the order and initiates a refund process for the given order ID.
 
@@ -113,19 +163,101 @@ def initiate_refund_for_order_id(orderId: str) -> str:
         response = initiate_refund_for_order_id("ORD12345")
         # response: '{"status": "success", "order_id": "ORD12345", "message": "Refund initiated successfully."}'
     """
-    result = issue_refund_for_order(orderId)
+    result = await run_blocking("notification", issue_refund_for_order, orderId)
+    return json.dumps(result)
+
+@mcp.tool
+async def batch_classify_documents(file_paths: List[str], ctx: Context) -> str:
+    """
+    Classify the document type of many files, e.g. an intake backlog.
+    Previously classified files and duplicates are answered from cache.
+
+    Args:
+        file_paths (List[str]): Paths of the documents to classify, inside the server's document input directory
+
+    Returns:
+        str: A JSON string with "results", one per file, each containing file_path, cached and document_classifications (type and confidence) or an error
+    """
+    results = []
+    async for result in iterate_blocking("document", classify_documents, file_paths):
+        results.append(result)
+        await ctx.report_progress(progress=len(results), total=len(file_paths))
+        await ctx.info(json.dumps(result))
+    return json.dumps({"results": results})
+
+@mcp.tool
+async def get_table_statistics(table_name: str = "") -> str:
+    """
+    Get statistics for a NoSQL table, served from memory without reading the table.
+
+    Args:
+        table_name (str): The table name. Defaults to the customer_info table.
+
+    Returns:
+        str: JSON string with approximate_rows, the last exact row count and its timestamp, and table details
+    """
+    result = get_table_stats(table_name or None)
+    return json.dumps(result)
+
+@mcp.tool
+async def initiate_refunds_for_order_ids(orderIds: List[str]) -> str:
+    """
+    Cancels several orders and initiates a refund for each of them.
+
+    Args:
+        orderIds (List[str]): Unique identifiers of the orders to be cancelled and refunded.
+
+    Returns:
+        str: A JSON string containing success and, for each order, orderId and a message
+    """
+    result = await run_blocking("notification", issue_refunds_for_orders, orderIds)
     return json.dumps(result)
 
-# Health endpoint for k8s probes
+# Health endpoint for k8s probes. Always 200 so an unhealthy downstream does not
+# restart the pod; status is DEGRADED while any circuit breaker is not closed.
 @mcp.custom_route("/health", methods=["GET"])
-async def health_check(request: Request) -> PlainTextResponse:
-    return PlainTextResponse("OK")
+async def health_check(request: Request) -> JSONResponse:
+    breakers = breaker_states()
+    degraded = any(breaker["state"] != "CLOSED" for breaker in breakers.values())
+    return JSONResponse({"status": "DEGRADED" if degraded else "OK", "circuit_breakers": breakers})
+
+# Metrics endpoint: counters plus latency and payload size histograms per tool and OCI call
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> JSONResponse:
+    return JSONResponse({**metrics.snapshot(), "circuit_breakers": breaker_states(), "bulkheads": bulkhead_usage(),
+                         "refund_outbox": get_refund_outbox().counts()})
+
+
+
+def warm_up_document_store():
+    store = get_document_store()
+    if store is not None and hasattr(store, "client"):
+        warm_signer(store.client)
+
+
+# OCI clients and signer tokens are created in parallel at startup rather than
+# on the first tool call; seeding sample data runs after the server is ready.
+startup = Startup(
+    warm_up_steps={
+        "nosql": warm_up_nosql_client,
+        "language": lambda: warm_signer(get_language_client()),
+        "document": lambda: warm_signer(get_document_client()),
+        "notification": lambda: warm_signer(get_notification_client()),
+        "document_store": warm_up_document_store,
+    },
+    background_tasks=[seed_customer_info_table, seed_order_info_table]
+)
+
+# Readiness endpoint for k8s: 503 until the warm-up has completed
+@mcp.custom_route("/ready", methods=["GET"])
+async def readiness_check(request: Request) -> JSONResponse:
+    return JSONResponse(startup.to_dict(), status_code=200 if startup.is_ready() else 503)
 
 
 if __name__ == "__main__":
-       
-    seed_customer_info_table()
-    seed_order_info_table()
+    startup.start()
+    start_table_stats_refresh()
+    get_refund_outbox()
     # Expose Streamable HTTP transport so clients can connect over the network.
     # MCP endpoint will be available at http://<host>:<port>/mcp/
-    mcp.run(transport="http", host=HOST, port=PORT)
\ No newline at end of file
+    mcp.run(transport="http", host=HOST, port=PORT)
@@ -0,0 +1,96 @@
+"""
+Concurrency benchmark for the MCP tools.
+
+Runs the FastMCP server in-process against latency-injecting fakes and drives
+a tool with an increasing number of concurrent clients. Because the tools
+offload blocking SDK calls to bounded per-downstream executors, throughput
+should grow with the client count until the downstream's worker limit is hit.
+
+Usage:
+    python benchmarks/concurrency_benchmark.py --tool get_customer_id --clients 1 2 4 8 16
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fakes import install_fakes  # noqa: E402
+
+# Arguments are unique per call, so calls are neither coalesced with
+# concurrent identical calls nor served from the result caches, and the
+# table measures executor scaling alone.
+TOOL_ARGUMENTS = {
+    "sentiment_analysis": lambda: {"text": f"The delivery {uuid.uuid4()} was late and the box was damaged."},
+    "batch_sentiment_analysis": lambda: {"texts": [f"The delivery {uuid.uuid4()} was late.", f"Great service, thank you! {uuid.uuid4()}",
+                                                   f"Where is my refund for {uuid.uuid4()}?"]},
+    "get_customer_info": lambda: {"email": f"{uuid.uuid4()}@example.com"},
+    "get_customer_id": lambda: {"email": f"{uuid.uuid4()}@example.com"},
+    "get_open_orders_by_customer_id": lambda: {"customerId": f"CUST-{uuid.uuid4()}"},
+    "initiate_refund_for_order_id": lambda: {"orderId": f"ORD-{uuid.uuid4()}"},
+}
+
+
+async def run_client(mcp, tool: str, calls: int, latencies: list):
+    from fastmcp import Client
+
+    async with Client(mcp) as client:
+        for _ in range(calls):
+            started = time.perf_counter()
+            await client.call_tool(tool, TOOL_ARGUMENTS[tool]())
+            latencies.append(time.perf_counter() - started)
+
+
+async def run_level(mcp, tool: str, clients: int, calls_per_client: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(mcp, tool, calls_per_client, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "clients": clients,
+        "calls": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+    }
+
+
+async def run_isolation(mcp, clients: int, calls_per_client: int) -> dict:
+    """Measure NoSQL tool latency while the language tool is saturated by slow calls."""
+    slow = [run_client(mcp, "sentiment_analysis", calls_per_client, []) for _ in range(clients)]
+    fast_latencies = []
+    fast = run_client(mcp, "get_customer_id", calls_per_client, fast_latencies)
+    await asyncio.gather(fast, *slow)
+    fast_latencies.sort()
+    return {"get_customer_id_p50_ms": round(fast_latencies[len(fast_latencies) // 2] * 1000, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tool", default="get_customer_id", choices=sorted(TOOL_ARGUMENTS))
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--calls-per-client", type=int, default=10)
+    parser.add_argument("--nosql-latency", type=float, default=0.05)
+    parser.add_argument("--language-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    install_fakes(latency={"nosql": args.nosql_latency, "language": args.language_latency})
+    from app import mcp
+
+    async def run():
+        print(f"{'clients':>8} {'calls':>6} {'elapsed_s':>10} {'rps':>8} {'p50_ms':>8}")
+        for clients in args.clients:
+            row = await run_level(mcp, args.tool, clients, args.calls_per_client)
+            print(f"{row['clients']:>8} {row['calls']:>6} {row['elapsed_s']:>10} {row['throughput_rps']:>8} {row['p50_ms']:>8}")
+        isolation = await run_isolation(mcp, max(args.clients), args.calls_per_client)
+        print(f"get_customer_id p50 while sentiment_analysis is saturated: {isolation['get_customer_id_p50_ms']} ms")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
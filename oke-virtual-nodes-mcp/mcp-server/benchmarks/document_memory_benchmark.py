@@ -0,0 +1,70 @@
+"""
+Peak memory benchmark for document ingestion in classify_document.
+
+For each file size, measures the peak Python heap (tracemalloc) of:
+  legacy     - f.read() followed by base64.b64encode(...).decode()
+  streaming  - tools.document_ingest.encode_file_base64 (mmap + chunked encode)
+  reference  - storing the file in a LocalDocumentStore and referencing it
+
+Usage:
+    python benchmarks/document_memory_benchmark.py --sizes-mb 1 4 16 64
+"""
+import argparse
+import base64
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tools.document_ingest import CHUNK_SIZE, LocalDocumentStore, encode_file_base64  # noqa: E402
+
+
+def legacy_encode(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        document_data = f.read()
+    return base64.b64encode(document_data).decode('utf-8')
+
+
+def measure(func, *args) -> int:
+    tracemalloc.start()
+    result = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def write_file(path: str, size: int):
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining:
+            chunk = min(remaining, CHUNK_SIZE)
+            f.write(os.urandom(chunk))
+            remaining -= chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = LocalDocumentStore(os.path.join(workdir, "store"))
+        print(f"{'size_mb':>8} {'legacy_mb':>10} {'streaming_mb':>13} {'reference_mb':>13} {'legacy_x':>9} {'streaming_x':>12}")
+        for size_mb in args.sizes_mb:
+            size = int(size_mb * 1024 * 1024)
+            path = os.path.join(workdir, f"document-{size}.pdf")
+            write_file(path, size)
+            legacy = measure(legacy_encode, path)
+            streaming = measure(encode_file_base64, path)
+            reference = measure(store.put, path)
+            mb = 1024 * 1024
+            print(f"{size_mb:>8} {legacy / mb:>10.1f} {streaming / mb:>13.1f} {reference / mb:>13.1f} "
+                  f"{legacy / size:>9.2f} {streaming / size:>12.2f}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
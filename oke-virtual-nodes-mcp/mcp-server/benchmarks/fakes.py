@@ -0,0 +1,136 @@
+"""
+Latency-injecting stand-ins for the OCI clients used by the MCP tools.
+
+install_fakes() swaps the create_*_client factories in the tools package for
+fakes that sleep for a configurable latency and fail at a configurable error
+rate, so the server can be exercised without an OCI tenancy.
+"""
+import random
+import sys
+import os
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import oci  # noqa: E402
+from tools import classify_document, nosql_client, notification_client, text_analysis  # noqa: E402
+
+
+class FakeDownstream:
+    """Base class that injects latency and errors into every call."""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            raise oci.exceptions.ServiceError(
+                status=503, code="ServiceUnavailable", headers={}, message="Injected failure")
+
+
+class FakeNosqlClient(FakeDownstream):
+    """Answers the statements issued by tools.nosql_client with canned rows."""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, row_count: int = 20):
+        super().__init__(latency, error_rate)
+        self.row_count = row_count
+
+    def query(self, query_details=None, **kwargs):
+        self._call()
+        statement = query_details.statement
+        if "count(" in statement.lower():
+            items = [{"total": self.row_count}]
+        elif "SELECT customerId" in statement:
+            items = [{"customerId": "CUST01"}]
+        elif "SELECT orderId" in statement:
+            items = [{"orderId": str(uuid.uuid4()), "status": "OPEN", "date": "2025-01-01T00:00:00", "amount": 42.0}]
+        else:
+            items = [{"customerId": "CUST01", "name": "John Doe", "address": "123 Main St",
+                      "email": "john@example.com", "phone": "123-456-7890"}]
+        return SimpleNamespace(status=200, data=SimpleNamespace(items=items), next_page=None)
+
+    def update_row(self, table_name_or_id=None, update_row_details=None, **kwargs):
+        self._call()
+        return SimpleNamespace(status=200, data=SimpleNamespace(version="v1", existing_value=None))
+
+    def get_table(self, table_name_or_id=None, **kwargs):
+        self._call()
+        return SimpleNamespace(status=200, data=SimpleNamespace(
+            name=table_name_or_id, lifecycle_state="ACTIVE", time_created=None, time_updated=None,
+            table_limits=SimpleNamespace(max_read_units=50, max_write_units=50, max_storage_in_g_bs=1)))
+
+
+class FakeLanguageClient(FakeDownstream):
+    """Returns a fixed classification and the first words of each document as key phrases."""
+
+    def batch_detect_language_text_classification(self, batch_detect_language_text_classification_details=None, **kwargs):
+        self._call()
+        documents = [
+            SimpleNamespace(key=doc.key, text_classification=[SimpleNamespace(label="Support", score=0.9)])
+            for doc in batch_detect_language_text_classification_details.documents
+        ]
+        return SimpleNamespace(status=200, data=SimpleNamespace(documents=documents, errors=[]))
+
+    def batch_detect_language_key_phrases(self, batch_detect_language_key_phrases_details=None, **kwargs):
+        self._call()
+        documents = [
+            SimpleNamespace(key=doc.key, key_phrases=[SimpleNamespace(text=word, score=0.5) for word in doc.text.split()[:3]])
+            for doc in batch_detect_language_key_phrases_details.documents
+        ]
+        return SimpleNamespace(status=200, data=SimpleNamespace(documents=documents, errors=[]))
+
+
+class FakeDocumentClient(FakeDownstream):
+    """Classifies every document as an invoice."""
+
+    def analyze_document(self, analyze_document_details=None, **kwargs):
+        self._call()
+        return SimpleNamespace(status=200, data=SimpleNamespace(
+            detected_document_types=[SimpleNamespace(document_type="INVOICE", confidence=0.95)]))
+
+
+class FakeNotificationClient(FakeDownstream):
+    """Accepts every published message."""
+
+    def publish_message(self, topic_id, message_details=None, **kwargs):
+        self._call()
+        return SimpleNamespace(status=200, data=SimpleNamespace(message_id=str(uuid.uuid4())))
+
+
+def install_fakes(latency: Optional[Dict[str, float]] = None, error_rate: Optional[Dict[str, float]] = None) -> Dict[str, FakeDownstream]:
+    """
+    Replace the OCI client factories in the tools package with fakes.
+
+    Args:
+        latency (dict): Seconds of latency per downstream ("nosql", "language", "document", "notification")
+        error_rate (dict): Fraction of calls that fail per downstream
+
+    Returns:
+        Dict[str, FakeDownstream]: The installed fakes keyed by downstream
+    """
+    latency = latency or {}
+    error_rate = error_rate or {}
+    os.environ.setdefault("COMPARTMENT_ID", "ocid1.compartment.oc1..fake")
+    os.environ.setdefault("NOTIFICATION_TOPIC_ID", "ocid1.onstopic.oc1..fake")
+
+    fakes = {
+        "nosql": FakeNosqlClient(latency.get("nosql", 0.05), error_rate.get("nosql", 0.0)),
+        "language": FakeLanguageClient(latency.get("language", 0.2), error_rate.get("language", 0.0)),
+        "document": FakeDocumentClient(latency.get("document", 0.5), error_rate.get("document", 0.0)),
+        "notification": FakeNotificationClient(latency.get("notification", 0.1), error_rate.get("notification", 0.0)),
+    }
+    nosql_client.create_nosql_client = lambda: fakes["nosql"]
+    text_analysis.create_ai_client = lambda: fakes["language"]
+    classify_document.create_ai_client = lambda: fakes["document"]
+    notification_client.create_notification_client = lambda: fakes["notification"]
+    for getter in (nosql_client.get_nosql_client, text_analysis.get_ai_client,
+                   classify_document.get_ai_client, notification_client.get_notification_client):
+        getter.cache_clear()
+    return fakes
@@ -0,0 +1,254 @@
+"""
+Load-test and latency benchmark for the MCP server.
+
+Starts the FastMCP HTTP server on a local port against the latency- and
+error-injecting fakes from fakes.py, then drives each tool with N concurrent
+streamable-HTTP clients. Reports throughput and p50/p95/p99 latency per tool
+and writes the results to a JSON file, so runs of different versions can be
+compared with --baseline.
+
+Usage:
+    python benchmarks/load_benchmark.py --clients 16 --calls-per-client 20 --output load-results.json
+    python benchmarks/load_benchmark.py --tools get_customer_id sentiment_analysis --baseline load-results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fakes import install_fakes  # noqa: E402
+
+DOWNSTREAMS = ("nosql", "language", "document", "notification")
+
+
+def make_tool_arguments(workdir: str) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """
+    Return a factory of call arguments per tool. Texts, documents, emails and
+    customer and order IDs are unique per call, so every call reaches the fake
+    downstream instead of being served by the result caches, coalesced with a
+    concurrent identical lookup or treated as a repeated refund.
+    """
+    def new_document() -> str:
+        document_path = os.path.join(workdir, f"invoice-{uuid.uuid4()}.txt")
+        with open(document_path, "w") as f:
+            f.write(f"Invoice {uuid.uuid4()}\nTotal due: 42.00\n")
+        return document_path
+
+    return {
+        "sentiment_analysis": lambda: {"text": f"The delivery {uuid.uuid4()} was late and the box was damaged."},
+        "batch_sentiment_analysis": lambda: {"texts": [f"The delivery {uuid.uuid4()} was late.", f"Great service, thank you! {uuid.uuid4()}",
+                                                       f"Where is my refund for {uuid.uuid4()}?"]},
+        "get_customer_info": lambda: {"email": f"{uuid.uuid4()}@example.com"},
+        "get_customer_id": lambda: {"email": f"{uuid.uuid4()}@example.com"},
+        "get_open_orders_by_customer_id": lambda: {"customerId": f"CUST-{uuid.uuid4()}"},
+        "initiate_refund_for_order_id": lambda: {"orderId": f"ORD-{uuid.uuid4()}"},
+        "initiate_refunds_for_order_ids": lambda: {"orderIds": [f"ORD-{uuid.uuid4()}" for _ in range(5)]},
+        "batch_classify_documents": lambda: {"file_paths": [new_document()]},
+        "get_table_statistics": lambda: {"table_name": ""},
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def is_error_result(result) -> bool:
+    """True if the tool reported an error, either as an MCP error or as an error field in its JSON output."""
+    if getattr(result, "is_error", False):
+        return True
+    content = getattr(result, "content", result)
+    for block in content or []:
+        text = getattr(block, "text", None)
+        if not text:
+            continue
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(payload, dict) and ("error" in payload or payload.get("success") is False):
+            return True
+    return False
+
+
+class BenchmarkServer:
+    """Runs the FastMCP HTTP app under uvicorn on a background thread."""
+
+    def __init__(self, host: str, port: int):
+        import uvicorn
+        from app import mcp
+
+        self.url = f"http://{host}:{port}/mcp"
+        self.server = uvicorn.Server(uvicorn.Config(mcp.http_app(), host=host, port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="benchmark-server", daemon=True)
+
+    def __enter__(self):
+        from tools.nosql_client import start_table_stats_refresh, stats_service
+
+        # get_table_statistics serves tracked tables only, as in app.py's startup.
+        start_table_stats_refresh()
+        stats_service.refresh_all()
+        self.thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError("MCP server did not start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+async def run_client(url: str, tool: str, arguments: Callable[[], Dict[str, Any]], calls: int,
+                     latencies: List[float], errors: List[str]):
+    from fastmcp import Client
+
+    async with Client(url) as client:
+        for _ in range(calls):
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments())
+                if is_error_result(result):
+                    errors.append("tool returned an error")
+            except Exception as e:
+                errors.append(type(e).__name__)
+            latencies.append(time.perf_counter() - started)
+
+
+async def benchmark_tool(url: str, tool: str, arguments: Callable[[], Dict[str, Any]], clients: int,
+                         calls_per_client: int) -> Dict[str, Any]:
+    # One untimed call so connection setup and first-use client creation are not measured.
+    await run_client(url, tool, arguments, 1, [], [])
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(url, tool, arguments, calls_per_client, latencies, errors) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "clients": clients,
+        "calls": len(latencies),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(latencies), 4) if latencies else 0.0,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline_path: str):
+    """Print the change in throughput and tail latency against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} (revision {baseline.get('revision')}):")
+    print(f"{'tool':<32} {'rps':>10} {'p50':>10} {'p95':>10} {'p99':>10}")
+
+    def change(new, old):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    for tool, row in results["tools"].items():
+        old = baseline.get("tools", {}).get(tool)
+        if not old:
+            print(f"{tool:<32} {'(new)':>10}")
+            continue
+        print(f"{tool:<32} {change(row['throughput_rps'], old['throughput_rps']):>10} {change(row['p50_ms'], old['p50_ms']):>10} "
+              f"{change(row['p95_ms'], old['p95_ms']):>10} {change(row['p99_ms'], old['p99_ms']):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", nargs="+", help="Tools to benchmark (default: all)")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent streamable-HTTP clients per tool")
+    parser.add_argument("--calls-per-client", type=int, default=20)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", default="load-benchmark-results.json", help="JSON file for the results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    for downstream in DOWNSTREAMS:
+        parser.add_argument(f"--{downstream}-latency", type=float, help=f"Seconds per {downstream} call")
+        parser.add_argument(f"--{downstream}-error-rate", type=float, default=0.0, help=f"Fraction of failing {downstream} calls")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="load-benchmark-")
+    os.environ.setdefault("REFUND_OUTBOX_PATH", os.path.join(workdir, "refund-outbox.db"))
+    os.environ.setdefault("DOCUMENT_INPUT_DIR", workdir)
+    latency = {d: getattr(args, f"{d}_latency") for d in DOWNSTREAMS if getattr(args, f"{d}_latency") is not None}
+    error_rate = {d: getattr(args, f"{d}_error_rate") for d in DOWNSTREAMS}
+    fakes = install_fakes(latency=latency, error_rate=error_rate)
+
+    tool_arguments = make_tool_arguments(workdir)
+    tools = args.tools or sorted(tool_arguments)
+    unknown = [tool for tool in tools if tool not in tool_arguments]
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(unknown)}")
+
+    results: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "clients": args.clients,
+            "calls_per_client": args.calls_per_client,
+            "latency": {name: fake.latency for name, fake in fakes.items()},
+            "error_rate": {name: fake.error_rate for name, fake in fakes.items()},
+        },
+        "tools": {},
+    }
+
+    async def run(url: str):
+        print(f"{'tool':<32} {'calls':>6} {'errors':>7} {'rps':>8} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+        for tool in tools:
+            row = await benchmark_tool(url, tool, tool_arguments[tool], args.clients, args.calls_per_client)
+            results["tools"][tool] = row
+            print(f"{tool:<32} {row['calls']:>6} {row['errors']:>7} {row['throughput_rps']:>8} "
+                  f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+
+    with BenchmarkServer(args.host, args.port) as server:
+        asyncio.run(run(server.url))
+
+    # Server-side latency of each outbound SDK call, to see which downstream dominates.
+    from tools import metrics
+    results["downstream_calls"] = {
+        name[len("oci."):-len(".latency_ms")]: histogram
+        for name, histogram in metrics.snapshot()["histograms"].items()
+        if name.startswith("oci.") and name.endswith(".latency_ms")
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.baseline:
+        compare_with_baseline(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, NamedTuple
+
+import oci
+from oci.retry import NoneRetryStrategy
+
+from tools import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+# Calls slower than this count as failures, per downstream. Each can be
+# overridden with an environment variable such as NOSQL_SLOW_CALL_SECONDS=2.
+DEFAULT_SLOW_CALL_SECONDS = {
+    "nosql": 5.0,
+    "language": 15.0,
+    "document": 60.0,
+    "notification": 10.0,
+    "object_storage": 120.0,
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a downstream whose circuit breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is unavailable (circuit breaker open), retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def is_failure(error: Exception) -> bool:
+    """True for errors that indicate an unhealthy downstream rather than a bad request."""
+    if isinstance(error, oci.exceptions.ServiceError):
+        return error.status == 429 or error.status >= 500
+    return not isinstance(error, (CircuitOpenError, ValueError, TypeError))
+
+
+class Admission(NamedTuple):
+    """Returned by CircuitBreaker.before_call and passed back to record."""
+    generation: int
+    probe: bool
+
+
+class CircuitBreaker:
+    """
+    Fails calls to a downstream fast while it is unhealthy.
+
+    The outcomes of the last window_size calls are kept; errors and calls
+    slower than slow_call_seconds count as failures. When at least min_calls
+    were made and the failure rate reaches failure_rate, the breaker opens and
+    rejects calls for open_seconds. It then lets half_open_calls probe calls
+    through, without SDK retries: a successful probe closes the breaker, a
+    failed one opens it again. Every state change starts a new generation;
+    outcomes of calls admitted in an earlier generation are ignored, so a slow
+    call that helped open the breaker cannot later close it.
+    """
+
+    def __init__(self, name: str, slow_call_seconds: float, failure_rate: float = 0.5, min_calls: int = 5,
+                 window_size: int = 20, open_seconds: float = 30.0, half_open_calls: int = 1):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> Admission:
+        """Admit a call or raise CircuitOpenError. The returned admission must be passed to record."""
+        with self._lock:
+            if self.state == OPEN:
+                retry_in = self._opened_at + self.open_seconds - time.monotonic()
+                if retry_in > 0:
+                    metrics.increment(f"circuit_breaker.{self.name}.rejected")
+                    raise CircuitOpenError(self.name, retry_in)
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    metrics.increment(f"circuit_breaker.{self.name}.rejected")
+                    raise CircuitOpenError(self.name, self.open_seconds)
+                self._probes += 1
+                metrics.increment(f"circuit_breaker.{self.name}.probes")
+                return Admission(self._generation, True)
+            return Admission(self._generation, False)
+
+    def record(self, admission: Admission, success: bool, duration: float):
+        """Record the outcome of a call admitted by before_call."""
+        failed = not success or duration > self.slow_call_seconds
+        with self._lock:
+            if admission.generation != self._generation:
+                return
+            if admission.probe:
+                self._probes -= 1
+                self._transition(OPEN if failed else CLOSED)
+                return
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            if state == OPEN:
+                self._opened_at = time.monotonic()
+            return
+        logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}")
+        self.state = state
+        self._generation += 1
+        self._probes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            metrics.increment(f"circuit_breaker.{self.name}.opened")
+        elif state == CLOSED:
+            self._outcomes.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            outcomes = list(self._outcomes)
+            return {
+                "state": self.state,
+                "recent_calls": len(outcomes),
+                "recent_failures": sum(outcomes),
+                "retry_in_seconds": round(max(self._opened_at + self.open_seconds - time.monotonic(), 0.0), 1) if self.state == OPEN else 0.0,
+            }
+
+
+def get_slow_call_seconds(downstream: str) -> float:
+    """Get the slow call threshold for a downstream from environment variables with default fallback."""
+    env_name = f"{downstream.upper()}_SLOW_CALL_SECONDS"
+    return float(os.environ.get(env_name, DEFAULT_SLOW_CALL_SECONDS.get(downstream, 30.0)))
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(downstream: str) -> CircuitBreaker:
+    """Return the circuit breaker of the given downstream service, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(downstream)
+        if breaker is None:
+            breaker = _breakers[downstream] = CircuitBreaker(
+                downstream,
+                slow_call_seconds=get_slow_call_seconds(downstream),
+                failure_rate=float(os.environ.get("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")),
+                min_calls=int(os.environ.get("CIRCUIT_BREAKER_MIN_CALLS", "5")),
+                window_size=int(os.environ.get("CIRCUIT_BREAKER_WINDOW", "20")),
+                open_seconds=float(os.environ.get("CIRCUIT_BREAKER_OPEN_SECONDS", "30")),
+            )
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Return the state of every circuit breaker, suitable for JSON serialization."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.to_dict() for name, breaker in sorted(breakers.items())}
+
+
+class ProtectedClient:
+    """Proxy around an OCI SDK client that routes every method call through a circuit breaker."""
+
+    def __init__(self, client: Any, breaker: CircuitBreaker):
+        self._client = client
+        self._breaker = breaker
+
+    def __getattr__(self, attribute: str) -> Any:
+        value = getattr(self._client, attribute)
+        if attribute.startswith("_") or not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def call(*args, **kwargs):
+            admission = self._breaker.before_call()
+            if admission.probe and "retry_strategy" in kwargs:
+                # A probe should report the downstream's health quickly, not retry through an outage.
+                kwargs["retry_strategy"] = NoneRetryStrategy()
+            started = time.monotonic()
+            try:
+                response = value(*args, **kwargs)
+            except Exception as e:
+                self._breaker.record(admission, not is_failure(e), time.monotonic() - started)
+                raise
+            self._breaker.record(admission, True, time.monotonic() - started)
+            return response
+        return call
+
+
+def protect_client(client: Any, downstream: str) -> Any:
+    """Wrap an OCI SDK client in the downstream's circuit breaker, unless CIRCUIT_BREAKER_ENABLED is false."""
+    if os.environ.get("CIRCUIT_BREAKER_ENABLED", "true").lower() != "true":
+        return client
+    return ProtectedClient(client, get_breaker(downstream))
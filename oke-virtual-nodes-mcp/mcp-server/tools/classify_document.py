@@ -1,14 +1,47 @@
 import oci
+import functools
 import logging
 import os
-import base64
-from oci.ai_document.models import AnalyzeDocumentDetails, DocumentFeature, InlineDocumentContent
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Tuple
+from oci.ai_document.models import AnalyzeDocumentDetails, DocumentFeature, InlineDocumentContent, ObjectStorageDocumentDetails
 from oci.retry import DEFAULT_RETRY_STRATEGY
+from pypdf import PdfReader, PdfWriter
+from tools.document_ingest import encode_file_base64, get_document_store, get_inline_max_bytes, hash_file, resolve_input_path
+from tools.result_cache import ResultCache
+from tools.circuit_breaker import protect_client
+from tools.executors import get_max_workers
+from tools.tracing import instrument_client, submit_in_context
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+PAGES_PER_RANGE = int(os.environ.get("DOCUMENT_PAGES_PER_RANGE", "10"))
+BATCH_CONCURRENCY = int(os.environ.get("DOCUMENT_BATCH_CONCURRENCY", "2"))
+PAGE_CONCURRENCY = int(os.environ.get("DOCUMENT_PAGE_CONCURRENCY", "4"))
+
+# Document Understanding calls in flight across every pool are bounded by the
+# document downstream's worker limit (DOCUMENT_MAX_WORKERS), as in tools.executors.
+DOCUMENT_MAX_WORKERS = get_max_workers("document")
+_document_slots = threading.BoundedSemaphore(DOCUMENT_MAX_WORKERS)
+
+# Files are processed on one pool and their page ranges on another, so a
+# file waiting for its ranges never blocks the ranges from running.
+_file_executor = ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, DOCUMENT_MAX_WORKERS), thread_name_prefix="document-file")
+_page_executor = ThreadPoolExecutor(max_workers=min(PAGE_CONCURRENCY, DOCUMENT_MAX_WORKERS), thread_name_prefix="document-pages")
+
+# Classification results keyed by the SHA-256 of the file content. Set
+# DOCUMENT_CACHE_PATH to keep them in a SQLite file across restarts.
+result_cache = ResultCache(
+    "document_classification",
+    max_entries=int(os.environ.get("DOCUMENT_CACHE_SIZE", "4096")),
+    ttl_seconds=float(os.environ.get("DOCUMENT_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    persist_path=os.environ.get("DOCUMENT_CACHE_PATH") or None
+)
+
 def create_ai_client():
     """Initialize and return the OCI AI Document Understanding client based on environment."""
     is_dev_env = os.environ.get("ENVIRONMENT", "").lower() == "dev"
@@ -30,25 +63,54 @@ def create_ai_client():
             config={"region": region},
             signer=signer)
 
+@functools.lru_cache(maxsize=None)
+def get_ai_client():
+    """Return the process-wide AI Document Understanding client, creating it on first use."""
+    return instrument_client(protect_client(create_ai_client(), "document"), "document")
+
+def prepare_document(file_path: str):
+    """
+    Build the document part of an analysis request.
+
+    Documents larger than DOCUMENT_INLINE_MAX_BYTES are stored in the
+    configured document store and passed by reference; smaller ones are
+    base64-encoded inline. Without a store, larger documents are refused so
+    encoding never holds an unbounded document in memory.
+
+    Args:
+        file_path (str): Path of the document
+
+    Returns:
+        InlineDocumentContent or ObjectStorageDocumentDetails
+    """
+    size = os.path.getsize(file_path)
+    inline_max_bytes = get_inline_max_bytes()
+    if size > inline_max_bytes:
+        store = get_document_store()
+        if store is None:
+            raise ValueError(f"Document is {size} bytes, above the inline limit of {inline_max_bytes} bytes; "
+                             "set DOCUMENT_STORE to classify large documents by reference")
+        logger.debug(f"Document is {size} bytes, passing it by Object Storage reference")
+        reference = store.put(file_path)
+        return ObjectStorageDocumentDetails(source="OBJECT_STORAGE", **reference)
+
+    logger.debug(f"Encoding {size} byte document inline")
+    return InlineDocumentContent(data=encode_file_base64(file_path))
+
 def classify_document(file_path: str) -> dict:
     logger.info(f"Starting document classification for file: {file_path}")
     try:
-        ai_client = create_ai_client()
+        ai_client = get_ai_client()
 
-        logger.debug("Reading document file")
-        with open(file_path, "rb") as f:
-            document_data = f.read()
-        encoded_data = base64.b64encode(document_data).decode('utf-8')
-
-        logger.debug("Preparing inline document content")
-        inline_content = InlineDocumentContent(data=encoded_data)
+        document = prepare_document(file_path)
 
         logger.debug("Preparing analysis details with DOCUMENT_CLASSIFICATION feature")
         features = [DocumentFeature(feature_type="DOCUMENT_CLASSIFICATION")]
-        details = AnalyzeDocumentDetails(document=inline_content, features=features)
+        details = AnalyzeDocumentDetails(document=document, features=features)
 
         logger.debug("Performing document analysis")
-        response = ai_client.analyze_document(analyze_document_details=details, retry_strategy=DEFAULT_RETRY_STRATEGY)
+        with _document_slots:
+            response = ai_client.analyze_document(analyze_document_details=details, retry_strategy=DEFAULT_RETRY_STRATEGY)
         logger.debug(f"Analysis response received: {response.data}")
 
         detected_types = response.data.detected_document_types
@@ -64,4 +126,127 @@ def classify_document(file_path: str) -> dict:
         return {"error": f"Service error: {e.message}"}
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
-        return {"error": f"An error occurred: {str(e)}"}
\ No newline at end of file
+        return {"error": f"An error occurred: {str(e)}"}
+
+def split_pdf_pages(file_path: str, workdir: str) -> List[Tuple[str, int]]:
+    """
+    Split a PDF into files of at most PAGES_PER_RANGE pages.
+
+    Args:
+        file_path (str): Path of the PDF
+        workdir (str): Directory for the page range files
+
+    Returns:
+        List[Tuple[str, int]]: Path and page count of each range, or the original file if it needs no splitting
+    """
+    with open(file_path, "rb") as source:
+        reader = PdfReader(source)
+        page_count = len(reader.pages)
+        if page_count <= PAGES_PER_RANGE:
+            return [(file_path, page_count)]
+
+        ranges = []
+        for start in range(0, page_count, PAGES_PER_RANGE):
+            writer = PdfWriter()
+            for page in reader.pages[start:start + PAGES_PER_RANGE]:
+                writer.add_page(page)
+            range_path = os.path.join(workdir, f"pages-{start + 1}.pdf")
+            with open(range_path, "wb") as f:
+                writer.write(f)
+            ranges.append((range_path, len(writer.pages)))
+    logger.debug(f"Split {file_path} ({page_count} pages) into {len(ranges)} page ranges")
+    return ranges
+
+def merge_range_results(results: List[Tuple[Dict[str, Any], int]]) -> Dict[str, Any]:
+    """Merge page range classifications, weighting each confidence by the pages in its range."""
+    errors = [result["error"] for result, _ in results if "error" in result]
+    if errors:
+        return {"error": errors[0]}
+    total_pages = sum(pages for _, pages in results) or 1
+    confidences: Dict[str, float] = {}
+    for result, pages in results:
+        for classification in result["document_classifications"]:
+            confidences[classification["type"]] = confidences.get(classification["type"], 0.0) + classification["confidence"] * pages
+    return {
+        "document_classifications": [
+            {"type": document_type, "confidence": round(weight / total_pages, 4)}
+            for document_type, weight in sorted(confidences.items(), key=lambda item: -item[1])
+        ],
+        "page_ranges": len(results)
+    }
+
+def classify_pages(file_path: str) -> Dict[str, Any]:
+    """
+    Classify a document, splitting multi-page PDFs into page ranges that are
+    classified concurrently and merged. PDFs above DOCUMENT_INLINE_MAX_BYTES
+    are not split, since that would parse them in memory; they are classified
+    whole, by reference.
+
+    Args:
+        file_path (str): Path of the document
+
+    Returns:
+        Dict[str, Any]: document_classifications or error
+    """
+    if not file_path.lower().endswith(".pdf") or os.path.getsize(file_path) > get_inline_max_bytes():
+        return classify_document(file_path)
+    with tempfile.TemporaryDirectory(prefix="document-pages-") as workdir:
+        try:
+            ranges = split_pdf_pages(file_path, workdir)
+        except Exception as e:
+            logger.warning(f"Could not split {file_path} into pages, classifying it whole: {str(e)}")
+            return classify_document(file_path)
+        if len(ranges) == 1:
+            return classify_document(file_path)
+        futures = [(submit_in_context(_page_executor, classify_document, range_path), pages) for range_path, pages in ranges]
+        return merge_range_results([(future.result(), pages) for future, pages in futures])
+
+def classify_documents(file_paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Classify many documents, yielding each file's result as soon as it is ready.
+
+    Files are deduplicated by content hash: results already in the cache are
+    returned without calling the service, and identical files in the same
+    batch are classified once. Paths that are not regular files inside
+    DOCUMENT_INPUT_DIR get an error result.
+
+    Args:
+        file_paths (List[str]): Paths of the documents, absolute or relative to DOCUMENT_INPUT_DIR
+
+    Yields:
+        Dict[str, Any]: file_path, content_hash, cached and document_classifications (or error)
+    """
+    logger.info(f"Starting batch document classification for {len(file_paths)} files")
+    paths_by_hash: Dict[str, List[str]] = {}
+    resolved_paths: Dict[str, str] = {}
+    for file_path in file_paths:
+        try:
+            resolved_paths[file_path] = resolve_input_path(file_path)
+            content_hash = hash_file(resolved_paths[file_path])
+        except ValueError as e:
+            logger.warning(f"Refused document path {file_path}")
+            yield {"file_path": file_path, "error": str(e)}
+            continue
+        except OSError as e:
+            logger.error(f"Could not read {file_path}: {str(e)}")
+            yield {"file_path": file_path, "error": f"An error occurred: {str(e)}"}
+            continue
+        paths_by_hash.setdefault(content_hash, []).append(file_path)
+
+    futures = {}
+    for content_hash, paths in paths_by_hash.items():
+        cached = result_cache.get(content_hash)
+        if cached is not None:
+            for file_path in paths:
+                yield {"file_path": file_path, "content_hash": content_hash, "cached": True, **cached}
+        else:
+            futures[submit_in_context(_file_executor, classify_pages, resolved_paths[paths[0]])] = content_hash
+
+    for future in as_completed(futures):
+        content_hash = futures[future]
+        result = future.result()
+        if "error" not in result:
+            result_cache.set(content_hash, result)
+        for file_path in paths_by_hash[content_hash]:
+            yield {"file_path": file_path, "content_hash": content_hash, "cached": False, **result}
+    logger.info("Batch document classification completed")
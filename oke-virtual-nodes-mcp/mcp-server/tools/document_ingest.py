@@ -0,0 +1,205 @@
+import oci
+import base64
+import functools
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+from typing import Dict, Optional
+
+from tools.circuit_breaker import protect_client
+from tools.tracing import instrument_client
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bytes read per step when encoding, hashing or copying a document. A multiple
+# of 3 so each base64 chunk encodes without padding.
+CHUNK_SIZE = 3 * 1024 * 1024
+# Bytes base64-encoded per step, kept small so the temporary raw and encoded
+# chunks stay negligible next to the full encoded document.
+ENCODE_CHUNK_SIZE = 3 * 64 * 1024
+
+
+def get_inline_max_bytes() -> int:
+    """Get the largest document sent inline from environment variables with default fallback."""
+    return int(os.environ.get("DOCUMENT_INLINE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+
+def get_input_dir() -> str:
+    """Get the directory documents may be read from, with symlinks resolved."""
+    return os.path.realpath(os.environ.get("DOCUMENT_INPUT_DIR", "/tmp/documents"))
+
+
+def resolve_input_path(file_path: str) -> str:
+    """
+    Resolve a document path given by a client, relative to DOCUMENT_INPUT_DIR.
+
+    Only regular files inside DOCUMENT_INPUT_DIR are accepted, after resolving
+    symlinks, so clients cannot read devices, FIFOs or other server files.
+    Every rejected path gets the same error, so existence cannot be probed.
+
+    Args:
+        file_path (str): Path of the document
+
+    Returns:
+        str: The resolved path
+
+    Raises:
+        ValueError: If the path is not a regular file inside DOCUMENT_INPUT_DIR
+    """
+    input_dir = get_input_dir()
+    resolved = os.path.realpath(os.path.join(input_dir, file_path))
+    if os.path.commonpath([resolved, input_dir]) != input_dir or not os.path.isfile(resolved):
+        raise ValueError(f"{file_path} is not a document in the input directory")
+    return resolved
+
+
+def encode_file_base64(file_path: str) -> str:
+    """
+    Base64-encode a file without holding a copy of its raw bytes on the heap.
+
+    The file is memory-mapped and encoded chunk by chunk into a buffer sized
+    for the encoded output, which is then decoded to str. While decoding, the
+    buffer and the str exist together, so peak heap use is about 2.7 times
+    the file size, against about 3.7 times for reading the file and encoding
+    it in one go. Callers bound the size with get_inline_max_bytes().
+
+    Args:
+        file_path (str): Path of the document
+
+    Returns:
+        str: The base64-encoded content
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return ""
+    encoded = bytearray(4 * ((size + 2) // 3))
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = 0
+        for offset in range(0, size, ENCODE_CHUNK_SIZE):
+            chunk = base64.b64encode(mapped[offset:offset + ENCODE_CHUNK_SIZE])
+            encoded[position:position + len(chunk)] = chunk
+            position += len(chunk)
+    data = encoded.decode("ascii")
+    del encoded
+    return data
+
+
+def hash_file(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def document_object_name(file_path: str, content_hash: Optional[str] = None) -> str:
+    """Return a content-addressed object name, so re-sent documents are uploaded once."""
+    prefix = os.environ.get("DOCUMENT_OBJECT_PREFIX", "documents/")
+    extension = os.path.splitext(file_path)[1].lower()
+    return f"{prefix}{content_hash or hash_file(file_path)}{extension}"
+
+
+class LocalDocumentStore:
+    """
+    Local-filesystem stand-in for Object Storage, for tests and benchmarks.
+
+    Files are copied in chunks into root_path/<bucket>/<object name> and
+    referenced the same way as Object Storage objects.
+    """
+
+    def __init__(self, root_path: str, bucket_name: str = "documents"):
+        self.root_path = root_path
+        self.namespace_name = "local"
+        self.bucket_name = bucket_name
+
+    def put(self, file_path: str, content_hash: Optional[str] = None) -> Dict[str, str]:
+        """
+        Store a document unless an identical one is already stored.
+
+        Returns:
+            Dict[str, str]: namespace_name, bucket_name and object_name of the stored document
+        """
+        object_name = document_object_name(file_path, content_hash)
+        target = os.path.join(self.root_path, self.bucket_name, object_name)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(file_path, "rb") as source, open(target, "wb") as destination:
+                shutil.copyfileobj(source, destination, CHUNK_SIZE)
+            logger.debug(f"Stored {file_path} as {target}")
+        return {"namespace_name": self.namespace_name, "bucket_name": self.bucket_name, "object_name": object_name}
+
+
+def create_object_storage_client():
+    """Initialize and return the OCI Object Storage client based on environment."""
+    is_dev_env = os.environ.get("ENVIRONMENT", "").lower() == "dev"
+
+    if is_dev_env:
+        logger.debug("Loading OCI configuration for Dev environment")
+        config = oci.config.from_file()
+        config["connection_timeout"] = 10.0
+        config["read_timeout"] = 120.0
+        logger.debug("Initializing Object Storage client with config")
+        return oci.object_storage.ObjectStorageClient(config)
+    else:
+        logger.debug("Loading OCI signer for non-Dev environment")
+        signer = oci.auth.signers.get_oke_workload_identity_resource_principal_signer()
+        region = os.environ.get("OCI_REGION", "us-ashburn-1")
+        logger.debug("Initializing Object Storage client with signer")
+        return oci.object_storage.ObjectStorageClient(
+            config={"region": region},
+            signer=signer)
+
+
+class ObjectStorageDocumentStore:
+    """
+    Uploads documents to an Object Storage bucket so they can be analyzed by
+    reference. Uploads stream the file in parts and skip objects that exist.
+    """
+
+    def __init__(self, bucket_name: str, namespace_name: Optional[str] = None):
+        self.client = instrument_client(protect_client(create_object_storage_client(), "object_storage"), "object_storage")
+        self.bucket_name = bucket_name
+        self.namespace_name = namespace_name or self.client.get_namespace().data
+
+    def put(self, file_path: str, content_hash: Optional[str] = None) -> Dict[str, str]:
+        """
+        Upload a document unless an identical one is already in the bucket.
+
+        Returns:
+            Dict[str, str]: namespace_name, bucket_name and object_name of the uploaded document
+        """
+        object_name = document_object_name(file_path, content_hash)
+        try:
+            self.client.head_object(self.namespace_name, self.bucket_name, object_name)
+            logger.debug(f"Object {object_name} already exists, skipping upload")
+        except oci.exceptions.ServiceError as e:
+            if e.status != 404:
+                raise
+            logger.debug(f"Uploading {file_path} to {self.bucket_name}/{object_name}")
+            upload_manager = oci.object_storage.UploadManager(self.client, allow_parallel_uploads=False)
+            upload_manager.upload_file(self.namespace_name, self.bucket_name, object_name, file_path, part_size=CHUNK_SIZE * 3)
+        return {"namespace_name": self.namespace_name, "bucket_name": self.bucket_name, "object_name": object_name}
+
+
+@functools.lru_cache(maxsize=None)
+def get_document_store():
+    """
+    Return the configured document store, or None to always send documents inline.
+
+    DOCUMENT_STORE selects "object_storage" (bucket DOCUMENT_BUCKET, optional
+    DOCUMENT_NAMESPACE) or "local" (directory DOCUMENT_STORE_PATH).
+    """
+    store_type = os.environ.get("DOCUMENT_STORE", "").lower()
+    if store_type == "object_storage":
+        bucket_name = os.environ.get("DOCUMENT_BUCKET")
+        if not bucket_name:
+            raise ValueError("DOCUMENT_BUCKET environment variable is required when DOCUMENT_STORE is object_storage")
+        return ObjectStorageDocumentStore(bucket_name, os.environ.get("DOCUMENT_NAMESPACE") or None)
+    if store_type == "local":
+        return LocalDocumentStore(os.environ.get("DOCUMENT_STORE_PATH", "/tmp/document-store"))
+    return None
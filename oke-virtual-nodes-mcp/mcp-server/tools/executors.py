@@ -0,0 +1,169 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+from tools import metrics
+from tools.singleflight import SingleFlight
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Default worker count per downstream service. Each can be overridden with
+# an environment variable such as NOSQL_MAX_WORKERS=16.
+DEFAULT_MAX_WORKERS = {
+    "nosql": 8,
+    "language": 4,
+    "document": 2,
+    "notification": 2,
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+_single_flights: Dict[str, SingleFlight] = {}
+_in_flight: Dict[str, int] = {}
+
+
+class BulkheadFullError(Exception):
+    """Raised when a downstream already has as many calls running and queued as it may hold."""
+
+
+def get_max_workers(downstream: str) -> int:
+    """Get the worker count for a downstream from environment variables with default fallback."""
+    env_name = f"{downstream.upper()}_MAX_WORKERS"
+    return int(os.environ.get(env_name, DEFAULT_MAX_WORKERS.get(downstream, 4)))
+
+
+def get_max_queue(downstream: str) -> int:
+    """Get how many calls may wait for a worker of a downstream, e.g. NOSQL_MAX_QUEUE=32."""
+    env_name = f"{downstream.upper()}_MAX_QUEUE"
+    return int(os.environ.get(env_name, 4 * get_max_workers(downstream)))
+
+
+@contextlib.contextmanager
+def bulkhead(downstream: str):
+    """
+    Admit a call to a downstream only if its workers and queue have room, so a
+    slow dependency fails fast instead of piling up requests for its pool.
+    """
+    limit = get_max_workers(downstream) + get_max_queue(downstream)
+    with _executors_lock:
+        if _in_flight.get(downstream, 0) >= limit:
+            metrics.increment(f"bulkhead.{downstream}.rejected")
+            raise BulkheadFullError(f"{downstream} is overloaded ({limit} calls in flight), try again later")
+        _in_flight[downstream] = _in_flight.get(downstream, 0) + 1
+    try:
+        yield
+    finally:
+        with _executors_lock:
+            _in_flight[downstream] -= 1
+
+
+def bulkhead_usage() -> Dict[str, Dict[str, int]]:
+    """Return calls in flight and the limit per downstream, suitable for JSON serialization."""
+    with _executors_lock:
+        in_flight = dict(_in_flight)
+    return {
+        downstream: {"in_flight": count, "limit": get_max_workers(downstream) + get_max_queue(downstream)}
+        for downstream, count in sorted(in_flight.items())
+    }
+
+
+def get_executor(downstream: str) -> ThreadPoolExecutor:
+    """Return the bounded thread pool dedicated to the given downstream service."""
+    with _executors_lock:
+        executor = _executors.get(downstream)
+        if executor is None:
+            max_workers = get_max_workers(downstream)
+            logger.debug(f"Creating executor for {downstream} with {max_workers} workers")
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{downstream}-worker")
+            _executors[downstream] = executor
+        return executor
+
+
+async def run_blocking(downstream: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking OCI SDK call on the executor of its downstream service.
+    Raises BulkheadFullError if the downstream's workers and queue are full.
+
+    Args:
+        downstream (str): Name of the downstream service, e.g. "nosql" or "language"
+        func (Callable): The blocking function to run
+
+    Returns:
+        Any: The return value of func
+    """
+    loop = asyncio.get_running_loop()
+    # Run in a copy of the caller's context so trace spans link to the calling tool.
+    context = contextvars.copy_context()
+    with bulkhead(downstream):
+        return await loop.run_in_executor(get_executor(downstream), functools.partial(context.run, func, *args, **kwargs))
+
+
+async def run_coalesced(downstream: str, func: Callable[..., Any], *args) -> Any:
+    """
+    Run a read-only blocking call on its downstream executor, sharing the result
+    with any identical call (same function and arguments) already in flight.
+
+    Args:
+        downstream (str): Name of the downstream service, e.g. "nosql" or "language"
+        func (Callable): The blocking, side-effect free function to run
+
+    Returns:
+        Any: The return value of func
+    """
+    single_flight = _single_flights.get(downstream)
+    if single_flight is None:
+        single_flight = _single_flights.setdefault(downstream, SingleFlight(downstream))
+    key = (func.__module__, func.__qualname__, args)
+    return await single_flight.do(key, lambda: run_blocking(downstream, func, *args))
+
+
+async def iterate_blocking(downstream: str, func: Callable[..., Iterator[Any]], *args) -> AsyncIterator[Any]:
+    """
+    Consume a blocking generator on its downstream executor, yielding each item
+    to the event loop as soon as it is produced.
+
+    Args:
+        downstream (str): Name of the downstream service, e.g. "language"
+        func (Callable): Function returning a blocking iterator
+
+    Yields:
+        Any: The items produced by the iterator
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def produce():
+        try:
+            for item in func(*args):
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    with bulkhead(downstream):
+        future = loop.run_in_executor(get_executor(downstream), contextvars.copy_context().run, produce)
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            yield item
+        # Surface any exception raised by the generator.
+        await future
+
+
+def shutdown_executors(wait: bool = True):
+    """Shut down all downstream executors."""
+    with _executors_lock:
+        executors = list(_executors.items())
+        _executors.clear()
+    for downstream, executor in executors:
+        logger.debug(f"Shutting down executor for {downstream}")
+        executor.shutdown(wait=wait)
@@ -0,0 +1,99 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence
+
+# Histogram bucket upper bounds for latencies in milliseconds and payload sizes in bytes.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+SIZE_BUCKETS_BYTES = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_counters: Dict[str, float] = defaultdict(int)
+_histograms: Dict[str, "Histogram"] = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Bucketed distribution of observed values with count, sum and max."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.bounds = tuple(buckets)
+        self.bucket_counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in, capped at the observed max."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.bucket_counts):
+            seen += count
+            if seen >= rank:
+                return round(min(bound, self.max), 3)
+        return round(self.max, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}": count for bound, count in zip(self.bounds, self.bucket_counts)}
+        buckets["le_inf"] = self.bucket_counts[-1]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "mean": round(self.sum / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+def increment(name: str, value: float = 1):
+    """Add value to the named counter."""
+    with _lock:
+        _counters[name] += value
+
+
+def get_counter(name: str) -> float:
+    """Return the current value of the named counter."""
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def observe(name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+    """Record value in the named histogram, creating it with the given buckets on first use."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def get_histogram(name: str) -> Dict[str, Any]:
+    """Return the named histogram as a dict, or an empty dict if nothing was observed."""
+    with _lock:
+        histogram = _histograms.get(name)
+        return histogram.to_dict() if histogram else {}
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Return a copy of all metrics, suitable for JSON serialization."""
+    with _lock:
+        return {
+            "counters": dict(sorted(_counters.items())),
+            "histograms": {name: _histograms[name].to_dict() for name in sorted(_histograms)},
+        }
+
+
+def reset():
+    """Clear all metrics."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
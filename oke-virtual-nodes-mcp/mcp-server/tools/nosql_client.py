@@ -1,4 +1,5 @@
 import oci
+import functools
 import logging
 import os
 import json
@@ -7,6 +8,11 @@ import random
 from typing import Dict, Any, Optional, List
 from oci.retry import DEFAULT_RETRY_STRATEGY
 import uuid
+from tools.table_stats import TableStatsService
+from tools.rate_limiter import INTERACTIVE, BACKGROUND, get_table_limiter, configure_table_limits
+from tools import metrics
+from tools.circuit_breaker import protect_client
+from tools.tracing import instrument_client
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -33,6 +39,41 @@ def create_nosql_client():
             config={"region": region},
             signer=signer)
 
+@functools.lru_cache(maxsize=None)
+def get_nosql_client():
+    """Return the process-wide NoSQL client, creating it on first use."""
+    return instrument_client(protect_client(create_nosql_client(), "nosql"), "nosql")
+
+def call_nosql(table_name: str, operation: str, method, priority: str = INTERACTIVE, **kwargs):
+    """
+    Call a NoSQL client method under the shared rate limit of the table.
+
+    One unit is reserved up front; once the response reports the units the
+    request actually consumed, the table's bucket is corrected accordingly.
+
+    Args:
+        table_name (str): Table the request reads from or writes to
+        operation (str): "read" or "write"
+        method (Callable): Bound NoSQL client method, e.g. nosql_client.query
+        priority (str): INTERACTIVE for MCP lookups, BACKGROUND for seeding and refreshes
+
+    Returns:
+        The client method's response
+    """
+    limiter = get_table_limiter(table_name, operation)
+    limiter.acquire(1, priority)
+    try:
+        response = method(**kwargs)
+    except oci.exceptions.ServiceError as e:
+        if e.status == 429:
+            metrics.increment(f"nosql.{table_name}.throttling_errors")
+        raise
+    usage = getattr(response.data, "usage", None)
+    consumed = getattr(usage, f"{operation}_units_consumed", None)
+    if consumed is not None:
+        limiter.adjust(consumed - 1)
+    return response
+
 def get_compartment_id() -> str:
     """Get the compartment ID from environment variables."""
     compartment_id = os.environ.get("COMPARTMENT_ID")
@@ -86,7 +127,7 @@ def seed_customer_info_table():
         "678-901-2346", "789-012-3457", "890-123-4568", "901-234-5679", "012-345-6790"
     ]
     table_name = get_customer_table_name()
-    nosql_client = create_nosql_client()
+    nosql_client = get_nosql_client()
     compartment_id = get_compartment_id()
     for i in range(20):        
         row_data = {
@@ -98,17 +139,24 @@ def seed_customer_info_table():
         }
         
         try:
-            nosql_client.update_row(
-                
+            # The customer IDs are fixed, so only insert rows that are absent;
+            # a restart then neither rewrites them nor counts them as new rows.
+            response = call_nosql(
+                table_name, "write", nosql_client.update_row, BACKGROUND,
                 table_name_or_id=table_name,
                 update_row_details=oci.nosql.models.UpdateRowDetails(
                     value=row_data,
                     compartment_id=compartment_id,
+                    option="IF_ABSENT",
                     is_get_return_row=True
                 ),
                 retry_strategy=DEFAULT_RETRY_STRATEGY
             )
+            if response.data.version is None:
+                logger.debug(f"Record for {sample_names[i]} with ID: {customer_ids[i]} already exists")
+                continue
             logger.debug(f"Inserted record for {sample_names[i]} with ID: {customer_ids[i]}")
+            stats_service.record_write(table_name)
         except Exception as e:
             logger.error(f"Error inserting seed record {i+1}: {str(e)}")
     
@@ -132,7 +180,7 @@ def seed_order_info_table():
     ]
     statuses = ["OPEN", "CLOSED", "SHIPPED", "CANCELLED"]
     table_name = get_order_table_name()
-    nosql_client = create_nosql_client()
+    nosql_client = get_nosql_client()
     compartment_id = get_compartment_id()
     for cust_id in customer_ids:
         for i in range(3):  # 3 orders per customer
@@ -144,8 +192,8 @@ def seed_order_info_table():
                 "amount": round(random.uniform(20, 500), 2),
             }
             try:
-                nosql_client.update_row(
-                
+                call_nosql(
+                    table_name, "write", nosql_client.update_row, BACKGROUND,
                     table_name_or_id=table_name,
                     update_row_details=oci.nosql.models.UpdateRowDetails(
                         value=order,
@@ -155,6 +203,7 @@ def seed_order_info_table():
                     retry_strategy=DEFAULT_RETRY_STRATEGY
                 )
                 logger.debug(f"Inserted record for cust ID: {cust_id}")
+                stats_service.record_write(table_name)
             except Exception as e:
                 logger.error(f"Error inserting seed record {i+1}: {str(e)}")
     
@@ -178,13 +227,14 @@ def get_customer_by_email(email: str) -> Dict[str, Any]:
         
         query = f"SELECT * FROM {table_name} WHERE email = '{email}'"
         
-        nosql_client = create_nosql_client()
+        nosql_client = get_nosql_client()
 
         query_details = oci.nosql.models.QueryDetails(
             statement=query,
             compartment_id=compartment_id
         )
-        query_response = nosql_client.query(
+        query_response = call_nosql(
+            table_name, "read", nosql_client.query,
             query_details=query_details,
             retry_strategy=DEFAULT_RETRY_STRATEGY
         )
@@ -232,12 +282,13 @@ def get_customer_id_by_email(email: str) -> Dict[str, Any]:
         
         query = f"SELECT customerId FROM {table_name} WHERE email = '{email}'"
         
-        nosql_client = create_nosql_client()
+        nosql_client = get_nosql_client()
         query_details = oci.nosql.models.QueryDetails(
             statement=query,
             compartment_id=compartment_id
         )
-        query_response = nosql_client.query(
+        query_response = call_nosql(
+            table_name, "read", nosql_client.query,
             query_details=query_details,
             retry_strategy=DEFAULT_RETRY_STRATEGY
         )
@@ -272,12 +323,13 @@ def get_open_orders(customer_id: str):
         compartment_id = get_compartment_id()
         table_name = get_order_table_name()
         query = f"SELECT orderId, status, date, amount FROM {table_name} WHERE customerId = '{customer_id}' AND status = 'OPEN'"
-        nosql_client = create_nosql_client()
+        nosql_client = get_nosql_client()
         query_details = oci.nosql.models.QueryDetails(
             statement=query,
             compartment_id=compartment_id
         )
-        query_response = nosql_client.query(
+        query_response = call_nosql(
+            table_name, "read", nosql_client.query,
             query_details=query_details,
             retry_strategy=DEFAULT_RETRY_STRATEGY
         )
@@ -300,58 +352,98 @@ def get_open_orders(customer_id: str):
             "message": "Failed to get orders"
         }
 
-def get_table_stats() -> Dict[str, Any]:
+def count_table_rows(table_name: str) -> int:
     """
-    Get statistics about the customer info table.
-    
+    Count the rows of a table with a full scan, following result pages.
+
+    Args:
+        table_name (str): Table name
+
     Returns:
-        Dict[str, Any]: Table statistics
+        int: Exact row count
     """
-    logger.info("Getting table statistics")
-    
-    try:
-        # Get configuration
-        compartment_id = get_compartment_id()
-        table_name = get_customer_table_name()
-        
-        # Get NoSQL client
-        nosql_client = create_nosql_client()
-        
-        # Get table details
+    nosql_client = get_nosql_client()
+    query_details = oci.nosql.models.QueryDetails(
+        statement=f"SELECT count(*) AS total FROM {table_name}",
+        compartment_id=get_compartment_id()
+    )
+    total_rows = 0
+    page = None
+    while True:
+        query_response = call_nosql(
+            table_name, "read", nosql_client.query, BACKGROUND,
+            query_details=query_details,
+            page=page,
+            retry_strategy=DEFAULT_RETRY_STRATEGY
+        )
+        for row in query_response.data.items:
+            total_rows += row["total"]
+        page = query_response.next_page
+        if not page:
+            return total_rows
+
+def fetch_table_stats(table_name: str) -> Dict[str, Any]:
+    """
+    Read table metadata and the exact row count from the NoSQL service.
+
+    Args:
+        table_name (str): Table name
+
+    Returns:
+        Dict[str, Any]: Table details and total_rows
+    """
+    compartment_id = get_compartment_id()
+    nosql_client = get_nosql_client()
+    table_response = nosql_client.get_table(
+        table_name_or_id=table_name,
+        compartment_id=compartment_id,
+        retry_strategy=DEFAULT_RETRY_STRATEGY
+    )
+    table_limits = table_response.data.table_limits
+    if table_limits:
+        configure_table_limits(table_name, table_limits.max_read_units, table_limits.max_write_units)
+    return {
+        "compartment_id": compartment_id,
+        "lifecycle_state": table_response.data.lifecycle_state,
+        "time_created": table_response.data.time_created.isoformat() if table_response.data.time_created else None,
+        "time_updated": table_response.data.time_updated.isoformat() if table_response.data.time_updated else None,
+        "total_rows": count_table_rows(table_name)
+    }
+
+def warm_up_nosql_client():
+    """
+    Create the NoSQL client and read both tables' metadata, so the first tool
+    call finds an authenticated connection and the rate limiters sized from
+    the provisioned table limits.
+    """
+    nosql_client = get_nosql_client()
+    for table_name in (get_customer_table_name(), get_order_table_name()):
         table_response = nosql_client.get_table(
             table_name_or_id=table_name,
-            compartment_id=compartment_id
+            compartment_id=get_compartment_id(),
+            retry_strategy=DEFAULT_RETRY_STRATEGY
         )
-        
-        # Get row count (approximate)
-        count_query = f"SELECT COUNT(*) as total FROM {table_name}"
-        count_response = nosql_client.query(query=count_query)
-        total_rows = count_response.data.items[0]["total"] if count_response.data.items else 0
-        
-        stats = {
-            "success": True,
-            "table_name": table_name,
-            "compartment_id": compartment_id,
-            "lifecycle_state": table_response.data.lifecycle_state,
-            "time_created": table_response.data.time_created.isoformat() if table_response.data.time_created else None,
-            "time_updated": table_response.data.time_updated.isoformat() if table_response.data.time_updated else None,
-            "total_rows": total_rows
-        }
-        
-        logger.info(f"Successfully retrieved table statistics: {total_rows} rows")
-        return stats
-        
-    except oci.exceptions.ServiceError as e:
-        logger.error(f"Service error getting table stats: {e.message}, Status: {e.status}, Code: {e.code}")
-        return {
-            "success": False,
-            "error": f"Service error: {e.message}",
-            "message": "Failed to get table statistics"
-        }
-    except Exception as e:
-        logger.error(f"Unexpected error getting table stats: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to get table statistics"
-        }
\ No newline at end of file
+        table_limits = table_response.data.table_limits
+        if table_limits:
+            configure_table_limits(table_name, table_limits.max_read_units, table_limits.max_write_units)
+
+# Exact counts are refreshed in the background; reads are served from memory.
+stats_service = TableStatsService(fetch_table_stats)
+
+def start_table_stats_refresh():
+    """Start refreshing statistics for the customer and order tables in the background."""
+    stats_service.start([get_customer_table_name(), get_order_table_name()])
+
+def get_table_stats(table_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get statistics about a table without reading from it.
+
+    Args:
+        table_name (str): Table name, defaults to the customer info table
+
+    Returns:
+        Dict[str, Any]: Table statistics
+    """
+    table_name = table_name or get_customer_table_name()
+    logger.info(f"Getting table statistics for {table_name}")
+    return stats_service.get_stats(table_name)
@@ -1,4 +1,5 @@
 import oci
+import functools
 import logging
 import os
 import json
@@ -8,6 +9,9 @@ from typing import Dict, Any, Optional, List
 from oci.retry import DEFAULT_RETRY_STRATEGY
 import uuid
 from oci.ons.models import MessageDetails
+from tools.refund_outbox import RefundOutbox
+from tools.circuit_breaker import protect_client
+from tools.tracing import instrument_client
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -34,6 +38,11 @@ def create_notification_client():
             config={"region": region},
             signer=signer)
     
+@functools.lru_cache(maxsize=None)
+def get_notification_client():
+    """Return the process-wide Notification client, creating it on first use."""
+    return instrument_client(protect_client(create_notification_client(), "notification"), "notification")
+
 def get_topic_id() -> str:
     """Get the compartment ID from environment variables."""
     topic_id = os.environ.get("NOTIFICATION_TOPIC_ID")
@@ -41,9 +50,53 @@ def get_topic_id() -> str:
         raise ValueError("NOTIFICATION_TOPIC_ID environment variable is required")
     return topic_id
     
+def publish_refund_notification(order_ids: List[str]):
+    """
+    Publish one notification covering the refunds of the given orders.
+
+    Args:
+        order_ids (List[str]): Order IDs refunded
+
+    Raises:
+        oci.exceptions.ServiceError: If the message could not be published
+    """
+    topic_id = get_topic_id()
+
+    # Set subject and message
+    subject = "Refund Issued" if len(order_ids) == 1 else f"Refunds Issued ({len(order_ids)} orders)"
+    message = "\n".join(
+        f"Hello, this is a inform you that your Order number: {order_id}! is cancelled." for order_id in order_ids
+    )
+
+    # Publish the message
+    publish_details = MessageDetails(
+        title=subject,
+        body=message
+    )
+    notification_client = get_notification_client()
+    response = notification_client.publish_message(
+        topic_id,
+        message_details=publish_details,
+        retry_strategy=DEFAULT_RETRY_STRATEGY
+    )
+    logger.info("Message published. Message ID: %s", response.data.message_id)
+
+@functools.lru_cache(maxsize=None)
+def get_refund_outbox() -> RefundOutbox:
+    """Return the process-wide refund outbox, starting its dispatcher on first use."""
+    outbox = RefundOutbox(
+        os.environ.get("REFUND_OUTBOX_PATH", "/tmp/refund-outbox.db"),
+        publish_refund_notification,
+        batch_size=int(os.environ.get("REFUND_BATCH_SIZE", "50")),
+        batch_window=float(os.environ.get("REFUND_BATCH_WINDOW_SECONDS", "0.5"))
+    )
+    outbox.start()
+    return outbox
+
 def issue_refund_for_order(order_id: str) -> Dict[str, Any]:
     """
-    Initiate refund for orderid.
+    Initiate refund for orderid. The customer notification is queued and sent
+    in the background.
     
     Args:
         order_id (str): Order ID
@@ -54,28 +107,11 @@ def issue_refund_for_order(order_id: str) -> Dict[str, Any]:
     logger.info(f"Initiatint refund for OrderId: {order_id}")
     
     try:
-        topic_id = get_topic_id()
-        
-        # Set subject and message
-        subject = "Refund Issued"
-        message = f"Hello, this is a inform you that your Order number: {order_id}! is cancelled."
-        
-        # Publish the message
-        publish_details = MessageDetails(
-            title=subject,
-            body=message
-        )
-        notification_client = create_notification_client()
-        response = notification_client.publish_message(
-            topic_id,
-            message_details=publish_details
-        )
-
-        logger.info("Message published. Message ID: %s", response.data.message_id)
+        queued = get_refund_outbox().enqueue([order_id])
         return {
             "success": True,
             "orderId": order_id,
-            "message": "Order cancelled successfully"
+            "message": "Order cancelled successfully" if queued[order_id] else "Refund already initiated"
         }
                 
     except Exception as e:
@@ -84,4 +120,37 @@ def issue_refund_for_order(order_id: str) -> Dict[str, Any]:
             "success": False,
             "error": str(e),
             "message": "Failed to cancel order"
-        }
\ No newline at end of file
+        }
+
+def issue_refunds_for_orders(order_ids: List[str]) -> Dict[str, Any]:
+    """
+    Initiate refunds for many orders at once. Notifications are queued and
+    published in batches in the background.
+
+    Args:
+        order_ids (List[str]): Order IDs
+
+    Returns:
+        Dict[str, Any]: Per-order results or error
+    """
+    logger.info(f"Initiating refunds for {len(order_ids)} orders")
+
+    try:
+        queued = get_refund_outbox().enqueue(order_ids)
+        return {
+            "success": True,
+            "results": [
+                {
+                    "orderId": order_id,
+                    "message": "Order cancelled successfully" if queued[order_id] else "Refund already initiated"
+                }
+                for order_id in order_ids
+            ]
+        }
+    except Exception as e:
+        logger.error(f"Error cancelling orders: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to cancel orders"
+        }
@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from tools import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Request priorities. Interactive MCP lookups are served before background
+# work such as seeding, inserts and statistics refreshes.
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with two priorities.
+
+    Interactive callers may use every available token. Background callers
+    leave a reserve untouched and wait while any interactive caller is
+    waiting, so background work cannot delay interactive requests.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: Optional[float] = None, background_reserve: float = 0.2):
+        """
+        Args:
+            name (str): Name used in metrics
+            rate (float): Tokens added per second
+            capacity (float): Maximum burst size, defaults to one second of tokens
+            background_reserve (float): Fraction of capacity background callers cannot use, at least 0 and below 1
+        """
+        self.name = name
+        self._condition = threading.Condition()
+        self._interactive_waiting = 0
+        self.rate = max(float(rate), 0.001)
+        self.capacity = float(capacity) if capacity else self.rate
+        self.background_reserve = check_background_reserve(background_reserve)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def configure(self, rate: float, capacity: Optional[float] = None, background_reserve: Optional[float] = None):
+        """Change the refill rate and capacity, e.g. after the table limits are read."""
+        with self._condition:
+            self._refill()
+            self.rate = max(float(rate), 0.001)
+            self.capacity = float(capacity) if capacity else self.rate
+            if background_reserve is not None:
+                self.background_reserve = check_background_reserve(background_reserve)
+            self._tokens = min(self._tokens, self.capacity)
+            self._condition.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _max_units(self, priority: str) -> float:
+        # The most tokens a caller of this priority can ever see available.
+        if priority == INTERACTIVE:
+            return self.capacity
+        return self.capacity - self.capacity * self.background_reserve
+
+    def _available(self, priority: str) -> float:
+        if priority == INTERACTIVE:
+            return self._tokens
+        if self._interactive_waiting:
+            return 0.0
+        return self._tokens - self.capacity * self.background_reserve
+
+    def acquire(self, units: float = 1, priority: str = INTERACTIVE) -> float:
+        """
+        Block until units tokens are available and take them. Requests larger
+        than the priority's share of the capacity take the whole share.
+
+        Args:
+            units (float): Number of tokens, e.g. estimated read units
+            priority (str): INTERACTIVE or BACKGROUND
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        started = time.monotonic()
+        with self._condition:
+            units = min(units, self._max_units(priority))
+            self._refill()
+            if self._available(priority) < units:
+                metrics.increment(f"ratelimit.{self.name}.{priority}.throttled")
+                if priority == INTERACTIVE:
+                    self._interactive_waiting += 1
+                try:
+                    while True:
+                        self._refill()
+                        deficit = units - self._available(priority)
+                        if deficit <= 0:
+                            break
+                        self._condition.wait(timeout=max(deficit / self.rate, 0.005))
+                finally:
+                    if priority == INTERACTIVE:
+                        self._interactive_waiting -= 1
+                        self._condition.notify_all()
+            self._tokens -= units
+        waited = time.monotonic() - started
+        metrics.increment(f"ratelimit.{self.name}.{priority}.requests")
+        if waited > 0:
+            metrics.increment(f"ratelimit.{self.name}.{priority}.wait_seconds", waited)
+        return waited
+
+    def adjust(self, units: float):
+        """
+        Correct the bucket once the real cost of a request is known.
+
+        A positive value takes more tokens (the bucket may go negative, which
+        delays later callers); a negative value returns unused tokens.
+        """
+        if not units:
+            return
+        with self._condition:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - units)
+            self._condition.notify_all()
+
+
+def check_background_reserve(background_reserve: float) -> float:
+    """Validate the fraction of a bucket reserved for interactive callers."""
+    if not 0 <= background_reserve < 1:
+        raise ValueError(f"background_reserve must be at least 0 and below 1, got {background_reserve}")
+    return float(background_reserve)
+
+
+_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_utilization() -> float:
+    """Get the fraction of provisioned table capacity the client may use, with default fallback."""
+    return float(os.environ.get("NOSQL_RATE_LIMIT_UTILIZATION", "0.9"))
+
+
+def get_default_units(operation: str) -> float:
+    """Get the provisioned read or write units from environment variables, matching the Terraform table limits."""
+    return float(os.environ.get(f"NOSQL_MAX_{operation.upper()}_UNITS", "50"))
+
+
+def get_table_limiter(table_name: str, operation: str) -> TokenBucket:
+    """
+    Return the shared token bucket for a table's read or write units.
+
+    Args:
+        table_name (str): Table name
+        operation (str): "read" or "write"
+
+    Returns:
+        TokenBucket: The bucket shared by every caller in this process
+    """
+    key = (table_name, operation)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            rate = get_default_units(operation) * get_utilization()
+            bucket = TokenBucket(f"nosql.{table_name}.{operation}", rate)
+            _buckets[key] = bucket
+        return bucket
+
+
+def configure_table_limits(table_name: str, max_read_units: Optional[float], max_write_units: Optional[float]):
+    """Size the buckets of a table from its provisioned limits as reported by the NoSQL service."""
+    utilization = get_utilization()
+    for operation, units in (("read", max_read_units), ("write", max_write_units)):
+        if units:
+            bucket = get_table_limiter(table_name, operation)
+            if bucket.rate != units * utilization:
+                logger.info(f"Rate limiting {operation}s on table {table_name} to {units * utilization} units/s")
+                bucket.configure(units * utilization)
@@ -0,0 +1,179 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tools import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PENDING = "PENDING"
+SENT = "SENT"
+FAILED = "FAILED"
+
+
+class RefundOutbox:
+    """
+    SQLite outbox of refund notifications.
+
+    Tools record refunds here and return immediately. A background dispatcher
+    claims pending refunds in batches, hands each batch to publish_func and
+    marks it sent, or schedules a retry with exponential backoff. Each order
+    is recorded once, so repeated refund requests do not notify twice; a
+    refund that FAILED after max_attempts is queued again when requested again.
+
+    Pending refunds last as long as the file at path: on the emptyDir volume
+    of the sample manifest they survive container restarts, but not the pod
+    being deleted or rescheduled.
+    """
+
+    def __init__(self, path: str, publish_func: Callable[[List[str]], None], batch_size: int = 50,
+                 batch_window: float = 0.5, max_attempts: int = 8, retry_base_delay: float = 2.0):
+        """
+        Args:
+            path (str): SQLite file of the outbox
+            publish_func (Callable): Publishes one notification for a list of order IDs, raising on failure
+            batch_size (int): Maximum refunds per published message
+            batch_window (float): Seconds to wait for more refunds before publishing
+            max_attempts (int): Attempts before a refund is marked FAILED
+            retry_base_delay (float): Seconds before the first retry, doubled on each attempt
+        """
+        self.publish_func = publish_func
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS refunds (
+                order_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                sent_at REAL,
+                last_error TEXT
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS refunds_pending ON refunds (status, next_attempt_at)")
+        self._db.commit()
+
+    def enqueue(self, order_ids: List[str]) -> Dict[str, bool]:
+        """
+        Record refunds for the given orders.
+
+        Returns:
+            Dict[str, bool]: For each order ID, True if it was queued now, False if it was already pending or sent
+        """
+        now = time.time()
+        queued = {}
+        with self._lock:
+            for order_id in order_ids:
+                if order_id in queued:
+                    continue
+                cursor = self._db.execute(
+                    "INSERT INTO refunds (order_id, status, next_attempt_at, created_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (order_id) DO UPDATE SET status = excluded.status, attempts = 0, "
+                    "next_attempt_at = excluded.next_attempt_at, last_error = NULL WHERE refunds.status = ?",
+                    (order_id, PENDING, now, now, FAILED))
+                queued[order_id] = cursor.rowcount == 1
+            self._db.commit()
+        metrics.increment("refund_outbox.enqueued", sum(queued.values()))
+        self._wake_event.set()
+        return queued
+
+    def _claim_batch(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT order_id, attempts FROM refunds WHERE status = ? AND next_attempt_at <= ? ORDER BY created_at LIMIT ?",
+                (PENDING, time.time(), self.batch_size)).fetchall()
+
+    def _mark_sent(self, order_ids: List[str]):
+        with self._lock:
+            self._db.executemany("UPDATE refunds SET status = ?, sent_at = ?, attempts = attempts + 1 WHERE order_id = ?",
+                                 [(SENT, time.time(), order_id) for order_id in order_ids])
+            self._db.commit()
+
+    def _mark_failed(self, batch: List[Tuple[str, int]], error: str):
+        now = time.time()
+        updates = []
+        for order_id, attempts in batch:
+            attempts += 1
+            status = FAILED if attempts >= self.max_attempts else PENDING
+            updates.append((status, attempts, now + self.retry_base_delay * 2 ** (attempts - 1), error, order_id))
+        with self._lock:
+            self._db.executemany("UPDATE refunds SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE order_id = ?", updates)
+            self._db.commit()
+
+    def dispatch_once(self) -> int:
+        """Publish one batch of due refunds. Returns the number of refunds published."""
+        batch = self._claim_batch()
+        if not batch:
+            return 0
+        order_ids = [order_id for order_id, _ in batch]
+        try:
+            self.publish_func(order_ids)
+        except Exception as e:
+            logger.error(f"Error publishing refund notification for {len(order_ids)} orders: {str(e)}")
+            metrics.increment("refund_outbox.publish_failures")
+            self._mark_failed(batch, str(e))
+            return 0
+        self._mark_sent(order_ids)
+        metrics.increment("refund_outbox.published_messages")
+        metrics.increment("refund_outbox.published_refunds", len(order_ids))
+        logger.info(f"Published refund notification for {len(order_ids)} orders")
+        return len(order_ids)
+
+    def _next_due_in(self) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute("SELECT MIN(next_attempt_at) FROM refunds WHERE status = ?", (PENDING,)).fetchone()
+        return max(row[0] - time.time(), 0.0) if row and row[0] is not None else None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait(timeout=self._next_due_in())
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            # Give concurrent refunds a moment to arrive so they share one message.
+            time.sleep(self.batch_window)
+            while self.dispatch_once() == self.batch_size:
+                pass
+
+    def start(self):
+        """Start the background dispatcher if it is not running."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="refund-dispatcher", daemon=True)
+            self._thread.start()
+        logger.info("Started refund notification dispatcher")
+        self._wake_event.set()
+
+    def stop(self):
+        """Stop the background dispatcher."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of refunds in each status."""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM refunds GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
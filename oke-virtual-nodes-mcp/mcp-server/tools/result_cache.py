@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from tools import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def content_hash(*parts: str) -> str:
+    """Return a SHA-256 hex digest identifying the given content."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache with a time-to-live for JSON-serializable results.
+
+    Entries live in memory and, when persist_path is set, are also written to
+    a SQLite file so they survive process restarts. Expiry uses wall-clock
+    time so persisted entries age correctly across restarts.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl_seconds: float = 3600, persist_path: Optional[str] = None):
+        """
+        Args:
+            name (str): Name used in metrics and logs
+            max_entries (int): Maximum number of entries kept in memory and on disk
+            ttl_seconds (float): Seconds an entry stays valid
+            persist_path (str): Optional SQLite file for persistence
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if persist_path:
+            self._open(persist_path)
+
+    def _open(self, persist_path: str):
+        try:
+            directory = os.path.dirname(persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._db.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+            logger.info(f"Persisting {self.name} cache to {persist_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Could not open {self.name} cache file {persist_path}, caching in memory only: {str(e)}")
+            self._db = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+                if row:
+                    entry = (json.loads(row[0]), row[1])
+                    self._store(key, entry)
+            if entry is not None and entry[1] < now:
+                self._delete(key)
+                entry = None
+            if entry is None:
+                metrics.increment(f"cache.{self.name}.misses")
+                return None
+            self._entries.move_to_end(key)
+        metrics.increment(f"cache.{self.name}.hits")
+        return entry[0]
+
+    def set(self, key: str, value: Any):
+        """Store value under key."""
+        entry = (value, time.time() + self.ttl_seconds)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                                     (key, json.dumps(value), entry[1]))
+                    self._db.execute("DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY expires_at DESC LIMIT ?)",
+                                     (self.max_entries,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Could not persist {self.name} cache entry: {str(e)}")
+
+    def _store(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.increment(f"cache.{self.name}.evictions")
+
+    def _delete(self, key: str):
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from tools import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one in-flight request.
+
+    The first caller for a key starts the work; callers that arrive with the
+    same key while it is running await the same result instead of issuing
+    their own downstream request. Nothing is cached once the call completes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func for key, or join the call already in flight for key.
+
+        Args:
+            key (Hashable): Identifies identical calls
+            func (Callable): Coroutine function that performs the call
+
+        Returns:
+            Any: The result of the shared call
+        """
+        metrics.increment(f"singleflight.{self.name}.calls")
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.increment(f"singleflight.{self.name}.coalesced")
+            logger.debug(f"Coalescing {self.name} call for key {key!r}")
+        else:
+            metrics.increment(f"singleflight.{self.name}.executions")
+            # The work runs in its own task so a cancelled caller does not
+            # cancel the request the other callers are waiting on.
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Return the number of distinct calls currently in flight."""
+        return len(self._inflight)
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from tools import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def warm_signer(client: Any):
+    """
+    Fetch the security token of a client's signer now instead of on its first
+    request. Signers without tokens, such as config file signers, are skipped.
+    """
+    signer = getattr(getattr(client, "base_client", None), "signer", None)
+    get_security_token = getattr(signer, "get_security_token", None)
+    if callable(get_security_token):
+        get_security_token()
+
+
+class Startup:
+    """
+    Readiness-aware startup sequence.
+
+    Warm-up steps (client construction, signer tokens, connection setup) run
+    in parallel on a background thread; failed steps are retried with backoff
+    until all succeed. The server is ready once they have. Background tasks,
+    such as seeding sample data, run afterwards and never delay readiness.
+    """
+
+    def __init__(self, warm_up_steps: Dict[str, Callable[[], Any]], background_tasks: Optional[List[Callable[[], Any]]] = None,
+                 retry_delay: float = 2.0, max_retry_delay: float = 30.0):
+        self.warm_up_steps = warm_up_steps
+        self.background_tasks = background_tasks or []
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self._steps: Dict[str, Dict[str, Any]] = {name: {"status": "PENDING"} for name in warm_up_steps}
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _run_step(self, name: str):
+        started = time.perf_counter()
+        try:
+            self.warm_up_steps[name]()
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {str(e)}")
+            with self._lock:
+                self._steps[name] = {"status": "FAILED", "error": str(e), "attempts": self._steps[name].get("attempts", 0) + 1}
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        metrics.observe(f"startup.{name}.latency_ms", duration_ms)
+        with self._lock:
+            self._steps[name] = {"status": "DONE", "duration_ms": round(duration_ms, 1),
+                                 "attempts": self._steps[name].get("attempts", 0) + 1}
+
+    def _pending(self) -> List[str]:
+        with self._lock:
+            return [name for name, step in self._steps.items() if step["status"] != "DONE"]
+
+    def _run(self):
+        delay = self.retry_delay
+        pending = self._pending()
+        with ThreadPoolExecutor(max_workers=max(len(pending), 1), thread_name_prefix="warm-up") as executor:
+            while pending:
+                list(executor.map(self._run_step, pending))
+                pending = self._pending()
+                if pending:
+                    logger.info(f"Retrying warm-up steps {pending} in {delay:.1f}s")
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+        self.ready_at = time.time()
+        self._ready.set()
+        logger.info(f"Server ready after {self.ready_at - self.started_at:.2f}s")
+
+        for task in self.background_tasks:
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"Background startup task {getattr(task, '__name__', task)} failed: {str(e)}")
+
+    def start(self):
+        """Start the warm-up and background tasks on a daemon thread."""
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="startup", daemon=True)
+        self._thread.start()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = {name: dict(step) for name, step in self._steps.items()}
+        return {
+            "status": "READY" if self.is_ready() else "WARMING_UP",
+            "seconds_to_ready": round(self.ready_at - self.started_at, 2) if self.ready_at else None,
+            "warm_up": steps,
+        }
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def get_refresh_interval() -> float:
+    """Get the exact-count refresh interval in seconds from environment variables with default fallback."""
+    return float(os.environ.get("TABLE_STATS_REFRESH_SECONDS", "300"))
+
+
+class TableStatsService:
+    """
+    Serve table statistics from memory.
+
+    Row counts are kept approximately current by record_write() as rows are
+    written, and replaced with exact figures by a background thread that calls
+    fetch_func on a fixed schedule. Reads never touch the table.
+    """
+
+    def __init__(self, fetch_func: Callable[[str], Dict[str, Any]], refresh_interval: Optional[float] = None):
+        """
+        Args:
+            fetch_func (Callable): Returns exact statistics for a table name, including "total_rows"
+            refresh_interval (float): Seconds between exact refreshes
+        """
+        self._fetch_func = fetch_func
+        self._refresh_interval = refresh_interval
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _entry(self, table_name: str) -> Dict[str, Any]:
+        entry = self._stats.get(table_name)
+        if entry is None:
+            entry = {
+                "table_name": table_name,
+                "exact_rows": None,
+                "exact_rows_as_of": None,
+                "rows_written_since_refresh": 0,
+                "details": {},
+                "last_error": None,
+                "refreshed_at_monotonic": None,
+            }
+            self._stats[table_name] = entry
+        return entry
+
+    def track(self, table_name: str):
+        """Register a table so the background thread refreshes it."""
+        with self._lock:
+            self._entry(table_name)
+
+    def record_write(self, table_name: str, rows: int = 1):
+        """Adjust the approximate row count after rows are written to a table."""
+        with self._lock:
+            self._entry(table_name)["rows_written_since_refresh"] += rows
+
+    def refresh(self, table_name: str) -> bool:
+        """Fetch exact statistics for one table and store them. Returns True on success."""
+        logger.debug(f"Refreshing exact statistics for table {table_name}")
+        started = time.monotonic()
+        try:
+            details = self._fetch_func(table_name)
+        except Exception as e:
+            logger.error(f"Error refreshing statistics for table {table_name}: {str(e)}")
+            with self._lock:
+                self._entry(table_name)["last_error"] = str(e)
+            return False
+
+        with self._lock:
+            entry = self._entry(table_name)
+            entry["exact_rows"] = details.pop("total_rows", None)
+            entry["details"] = details
+            entry["exact_rows_as_of"] = datetime.now(timezone.utc).isoformat()
+            # Writes that landed while the count was running may or may not be
+            # included in it; drop them rather than risk counting them twice.
+            entry["rows_written_since_refresh"] = 0
+            entry["refreshed_at_monotonic"] = started
+            entry["last_error"] = None
+        logger.info(f"Refreshed statistics for table {table_name}: {entry['exact_rows']} rows")
+        return True
+
+    def refresh_all(self):
+        """Refresh every tracked table."""
+        with self._lock:
+            table_names = list(self._stats)
+        for table_name in table_names:
+            self.refresh(table_name)
+
+    def get_stats(self, table_name: str) -> Dict[str, Any]:
+        """
+        Return the in-memory statistics for a table.
+
+        Args:
+            table_name (str): Table name
+
+        Returns:
+            Dict[str, Any]: Table statistics or error
+        """
+        with self._lock:
+            entry = self._stats.get(table_name)
+            if entry is None:
+                return {
+                    "success": False,
+                    "message": f"Statistics are not tracked for table {table_name}"
+                }
+            stats = {
+                "success": True,
+                "table_name": table_name,
+                **entry["details"],
+                "exact_rows": entry["exact_rows"],
+                "exact_rows_as_of": entry["exact_rows_as_of"],
+                "rows_written_since_refresh": entry["rows_written_since_refresh"],
+                "approximate_rows": (entry["exact_rows"] or 0) + entry["rows_written_since_refresh"],
+                "age_seconds": round(time.monotonic() - entry["refreshed_at_monotonic"], 1) if entry["refreshed_at_monotonic"] else None,
+            }
+            if entry["last_error"]:
+                stats["last_refresh_error"] = entry["last_error"]
+            return stats
+
+    def get_all_stats(self) -> List[Dict[str, Any]]:
+        """Return the in-memory statistics for every tracked table."""
+        with self._lock:
+            table_names = list(self._stats)
+        return [self.get_stats(table_name) for table_name in table_names]
+
+    def _run(self):
+        interval = self._refresh_interval or get_refresh_interval()
+        while not self._stop_event.is_set():
+            self.refresh_all()
+            self._stop_event.wait(interval)
+
+    def start(self, table_names: List[str]):
+        """Track the given tables and start the background refresh thread."""
+        for table_name in table_names:
+            self.track(table_name)
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="table-stats-refresh", daemon=True)
+        self._thread.start()
+        logger.info(f"Started table statistics refresh for {table_names}")
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
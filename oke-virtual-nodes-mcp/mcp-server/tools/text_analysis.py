@@ -1,6 +1,15 @@
 import oci
+import functools
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Tuple
+from tools.result_cache import ResultCache, content_hash
+from tools.text_chunking import split_into_chunks, aggregate_chunk_results
+from tools.circuit_breaker import protect_client
+from tools.tracing import instrument_client, submit_in_context
+from tools.executors import get_max_workers
 from oci.ai_language.models import TextDocument, BatchDetectLanguageSentimentsDetails, BatchDetectLanguageKeyPhrasesDetails
 from oci.retry import DEFAULT_RETRY_STRATEGY
 
@@ -8,6 +17,31 @@ from oci.retry import DEFAULT_RETRY_STRATEGY
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Limits of the batch_detect_* APIs. Override with environment variables if
+# the service limits for your tenancy differ.
+MAX_DOCUMENTS_PER_CALL = int(os.environ.get("LANGUAGE_MAX_DOCUMENTS_PER_CALL", "100"))
+MAX_CHARS_PER_DOCUMENT = int(os.environ.get("LANGUAGE_MAX_CHARS_PER_DOCUMENT", "5000"))
+MAX_CHARS_PER_CALL = int(os.environ.get("LANGUAGE_MAX_CHARS_PER_CALL", "20000"))
+BATCH_CONCURRENCY = int(os.environ.get("LANGUAGE_BATCH_CONCURRENCY", "4"))
+
+# AI Language calls in flight across every pool are bounded by the language
+# downstream's worker limit (LANGUAGE_MAX_WORKERS), as in tools.executors.
+LANGUAGE_MAX_WORKERS = get_max_workers("language")
+_language_slots = threading.BoundedSemaphore(LANGUAGE_MAX_WORKERS)
+
+_batch_executor = ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, LANGUAGE_MAX_WORKERS), thread_name_prefix="language-batch")
+# Runs the classification call of a request while the calling thread makes the key phrase call.
+_detect_executor = ThreadPoolExecutor(max_workers=LANGUAGE_MAX_WORKERS, thread_name_prefix="language-detect")
+
+# Analysis results keyed by a hash of the text. Set TEXT_ANALYSIS_CACHE_PATH
+# to keep them in a SQLite file across restarts.
+result_cache = ResultCache(
+    "text_analysis",
+    max_entries=int(os.environ.get("TEXT_ANALYSIS_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.environ.get("TEXT_ANALYSIS_CACHE_TTL_SECONDS", "3600")),
+    persist_path=os.environ.get("TEXT_ANALYSIS_CACHE_PATH") or None
+)
+
 def create_ai_client():
     """Initialize and return the OCI AI Language client based on environment."""
     is_dev_env = os.environ.get("ENVIRONMENT", "").lower() == "dev"
@@ -29,26 +63,63 @@ def create_ai_client():
             config={"region": region},
             signer=signer)
 
+@functools.lru_cache(maxsize=None)
+def get_ai_client():
+    """Return the process-wide AI Language client, creating it on first use."""
+    return instrument_client(protect_client(create_ai_client(), "language"), "language")
+
+def call_language(method, *args, **kwargs):
+    """Call an AI Language client method once a language slot is free."""
+    with _language_slots:
+        return method(*args, **kwargs)
+
+def detect_classification_and_key_phrases(text_documents: List[TextDocument]):
+    """
+    Call text classification and key phrase extraction concurrently.
+
+    Args:
+        text_documents (List[TextDocument]): Documents for one batch call
+
+    Returns:
+        Tuple: The classification response and the key phrase response
+    """
+    ai_client = get_ai_client()
+    logger.debug(f"Performing text classification and key phrase extraction for {len(text_documents)} documents")
+    classification_future = submit_in_context(
+        _detect_executor,
+        call_language,
+        ai_client.batch_detect_language_text_classification,
+        batch_detect_language_text_classification_details=oci.ai_language.models.BatchDetectLanguageTextClassificationDetails(
+            documents=text_documents
+        ),
+        retry_strategy=DEFAULT_RETRY_STRATEGY
+    )
+    key_phrase_response = call_language(
+        ai_client.batch_detect_language_key_phrases,
+        BatchDetectLanguageKeyPhrasesDetails(documents=text_documents),
+        retry_strategy=DEFAULT_RETRY_STRATEGY
+    )
+    return classification_future.result(), key_phrase_response
+
+def text_cache_key(text: str) -> str:
+    """Return the result cache key for a text."""
+    return content_hash("en", text)
+
 def analyze_text(text: str) -> dict:
     logger.info(f"Starting text analysis for input: {text[:50]}...")  # Log first 50 chars
+    cache_key = text_cache_key(text)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Text analysis served from cache")
+        return cached
+    if len(text) > MAX_CHARS_PER_DOCUMENT:
+        return analyze_long_text(text)
     try:
-        ai_client = create_ai_client()
-
         logger.debug("Preparing text document")
         text_document = TextDocument(key="input_text", text=text, language_code="en")
 
-        logger.debug("Performing text classification")
-        text_classification = ai_client.batch_detect_language_text_classification(
-            batch_detect_language_text_classification_details=oci.ai_language.models.BatchDetectLanguageTextClassificationDetails(
-                documents=[text_document]
-            )
-        )
+        text_classification, key_phrase_response = detect_classification_and_key_phrases([text_document])
         logger.debug(f"Text classification received: {text_classification.data}")
-               
-        
-        logger.debug("Performing key phrase extraction")
-        key_phrase_details = BatchDetectLanguageKeyPhrasesDetails(documents=[text_document])
-        key_phrase_response = ai_client.batch_detect_language_key_phrases(key_phrase_details, retry_strategy=DEFAULT_RETRY_STRATEGY)
         logger.debug(f"Key phrase response received: {key_phrase_response.data}")
         
         result = {
@@ -58,6 +129,7 @@ def analyze_text(text: str) -> dict:
             },
             "key_phrases": [kp.text for kp in key_phrase_response.data.documents[0].key_phrases]
         }
+        result_cache.set(cache_key, result)
         logger.info("Text analysis completed successfully")
         return result
     except oci.exceptions.ServiceError as e:
@@ -65,4 +137,167 @@ def analyze_text(text: str) -> dict:
         return {"error": f"Service error: {e.message}"}
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
-        return {"error": f"An error occurred: {str(e)}"}
\ No newline at end of file
+        return {"error": f"An error occurred: {str(e)}"}
+
+def pack_documents(documents: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    """
+    Pack (key, text) documents into as few batches as the API limits allow.
+
+    Uses first-fit decreasing: the longest documents are placed first, each
+    into the first batch with room for it by both document count and total
+    characters.
+
+    Args:
+        documents (List[Tuple[str, str]]): Documents no longer than MAX_CHARS_PER_DOCUMENT
+
+    Returns:
+        List[List[Tuple[str, str]]]: Batches of documents
+    """
+    batches: List[List[Tuple[str, str]]] = []
+    batch_chars: List[int] = []
+    for key, text in sorted(documents, key=lambda doc: len(doc[1]), reverse=True):
+        for i, batch in enumerate(batches):
+            if len(batch) < MAX_DOCUMENTS_PER_CALL and batch_chars[i] + len(text) <= MAX_CHARS_PER_CALL:
+                batch.append((key, text))
+                batch_chars[i] += len(text)
+                break
+        else:
+            batches.append([(key, text)])
+            batch_chars.append(len(text))
+    return batches
+
+def analyze_batch(batch: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Run text classification and key phrase extraction for one batch of documents.
+
+    Args:
+        batch (List[Tuple[str, str]]): (key, text) documents that fit in one call
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Result or error for each document key
+    """
+    text_documents = [TextDocument(key=key, text=text, language_code="en") for key, text in batch]
+    results: Dict[str, Dict[str, Any]] = {key: {} for key, _ in batch}
+
+    try:
+        classification_response, key_phrase_response = detect_classification_and_key_phrases(text_documents)
+    except oci.exceptions.ServiceError as e:
+        logger.error(f"Service error: {e.message}, Status: {e.status}, Code: {e.code}")
+        return {key: {"error": f"Service error: {e.message}"} for key in results}
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return {key: {"error": f"An error occurred: {str(e)}"} for key in results}
+
+    for document in classification_response.data.documents:
+        if document.text_classification:
+            results[document.key]["text_classification"] = {
+                "label": document.text_classification[0].label,
+                "score": document.text_classification[0].score
+            }
+    for document in key_phrase_response.data.documents:
+        results[document.key]["key_phrases"] = [kp.text for kp in document.key_phrases]
+    for response in (classification_response, key_phrase_response):
+        for error in response.data.errors or []:
+            results[error.key]["error"] = f"Service error: {error.error.message}"
+    return results
+
+def analyze_texts(texts: List[str]) -> dict:
+    """
+    Analyze many texts with as few batch API calls as possible.
+
+    Texts are packed into batches within the API's document-count and size
+    limits, and the batches are sent concurrently.
+
+    Args:
+        texts (List[str]): The texts to analyze
+
+    Returns:
+        dict: "results" in input order, each with text_classification and key_phrases or an error, and "calls", the number of batches sent
+    """
+    logger.info(f"Starting batch text analysis for {len(texts)} texts")
+    results: Dict[str, Dict[str, Any]] = {}
+    documents = []
+    long_texts = []
+    for i, text in enumerate(texts):
+        key = str(i)
+        if not text.strip():
+            results[key] = {"error": "Text is empty"}
+        elif len(text) > MAX_CHARS_PER_DOCUMENT:
+            long_texts.append((key, text))
+        else:
+            cached = result_cache.get(text_cache_key(text))
+            if cached is not None:
+                results[key] = dict(cached)
+            else:
+                documents.append((key, text))
+
+    batches = pack_documents(documents)
+    logger.debug(f"Packed {len(documents)} documents into {len(batches)} batches")
+    texts_by_key = dict(documents)
+    futures = [submit_in_context(_batch_executor, analyze_batch, batch) for batch in batches]
+    for batch_results in (future.result() for future in futures):
+        for key, result in batch_results.items():
+            if "error" not in result:
+                result_cache.set(text_cache_key(texts_by_key[key]), result)
+        results.update(batch_results)
+    for key, text in long_texts:
+        results[key] = analyze_long_text(text)
+
+    logger.info("Batch text analysis completed")
+    return {
+        "results": [{"index": i, **results[str(i)]} for i in range(len(texts))],
+        "calls": len(batches)
+    }
+
+def is_long_text(text: str) -> bool:
+    """Return True if the text must be split into chunks to be analyzed."""
+    return len(text) > MAX_CHARS_PER_DOCUMENT
+
+def iter_analyze_long_text(text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze a text of any length, yielding the aggregate result as chunks complete.
+
+    The text is split on sentence boundaries into chunks within
+    MAX_CHARS_PER_DOCUMENT, the chunks are packed into batches and the batches
+    are analyzed concurrently. After each batch a merged result is yielded;
+    the last one has "complete" set to True.
+
+    Args:
+        text (str): The text to analyze
+
+    Yields:
+        Dict[str, Any]: Aggregate text_classification, key_phrases and chunk progress, or an error for blank text
+    """
+    cache_key = text_cache_key(text)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Long text analysis served from cache")
+        yield cached
+        return
+
+    chunks = split_into_chunks(text, MAX_CHARS_PER_DOCUMENT)
+    if not chunks:
+        yield {"error": "Text is empty"}
+        return
+    batches = pack_documents([(str(i), chunk) for i, chunk in enumerate(chunks)])
+    logger.info(f"Analyzing long text of {len(text)} characters as {len(chunks)} chunks in {len(batches)} batches")
+
+    results: Dict[int, Dict[str, Any]] = {}
+    aggregate = aggregate_chunk_results(chunks, results)
+    futures = [submit_in_context(_batch_executor, analyze_batch, batch) for batch in batches]
+    for future in as_completed(futures):
+        for key, result in future.result().items():
+            results[int(key)] = result
+        aggregate = aggregate_chunk_results(chunks, results)
+        yield aggregate
+
+    if "errors" not in aggregate and "text_classification" in aggregate:
+        result_cache.set(cache_key, aggregate)
+    logger.info("Long text analysis completed")
+
+def analyze_long_text(text: str) -> Dict[str, Any]:
+    """Analyze a text of any length and return the final aggregate result."""
+    aggregate: Dict[str, Any] = {}
+    for aggregate in iter_analyze_long_text(text):
+        pass
+    return aggregate
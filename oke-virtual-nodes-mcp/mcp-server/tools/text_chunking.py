@@ -0,0 +1,101 @@
+import re
+from typing import Any, Dict, List
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_into_chunks(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars characters on sentence boundaries.
+
+    Sentences are kept whole where possible. A sentence longer than max_chars
+    is split on whitespace, and a single word longer than max_chars is cut.
+
+    Args:
+        text (str): The text to split
+        max_chars (int): Maximum characters per chunk
+
+    Returns:
+        List[str]: Non-empty chunks in text order
+    """
+    pieces: List[str] = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for word in sentence.split():
+            while len(word) > max_chars:
+                pieces.append(word[:max_chars])
+                word = word[max_chars:]
+            if word:
+                pieces.append(word)
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if not current:
+            current = piece
+        elif len(current) + 1 + len(piece) <= max_chars:
+            current = f"{current} {piece}"
+        else:
+            chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def aggregate_chunk_results(chunks: List[str], results: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk analysis results into one result for the whole text.
+
+    Each chunk's classification is weighted by its length. The aggregate label
+    is the one with the highest total weight and its score is that weight
+    divided by the length of all analyzed chunks. Key phrases are
+    deduplicated case-insensitively, keeping text order.
+
+    Args:
+        chunks (List[str]): All chunks of the text
+        results (Dict[int, Dict[str, Any]]): Results received so far, keyed by chunk index
+
+    Returns:
+        Dict[str, Any]: Aggregate text_classification, key_phrases and progress
+    """
+    label_weights: Dict[str, float] = {}
+    analyzed_chars = 0
+    key_phrases: List[str] = []
+    seen_phrases = set()
+    errors = []
+    for index in sorted(results):
+        result = results[index]
+        if "error" in result:
+            errors.append({"chunk": index, "error": result["error"]})
+            continue
+        length = len(chunks[index])
+        analyzed_chars += length
+        classification = result.get("text_classification")
+        if classification:
+            label_weights[classification["label"]] = label_weights.get(classification["label"], 0.0) + classification["score"] * length
+        for phrase in result.get("key_phrases", []):
+            if phrase.lower() not in seen_phrases:
+                seen_phrases.add(phrase.lower())
+                key_phrases.append(phrase)
+
+    aggregate: Dict[str, Any] = {
+        "chunks_completed": len(results),
+        "chunks_total": len(chunks),
+        "complete": len(results) == len(chunks),
+    }
+    if label_weights:
+        label = max(label_weights, key=label_weights.get)
+        aggregate["text_classification"] = {
+            "label": label,
+            "score": round(label_weights[label] / analyzed_chars, 4)
+        }
+        aggregate["label_distribution"] = {
+            name: round(weight / analyzed_chars, 4) for name, weight in sorted(label_weights.items(), key=lambda item: -item[1])
+        }
+    aggregate["key_phrases"] = key_phrases
+    if errors:
+        aggregate["errors"] = errors
+    return aggregate
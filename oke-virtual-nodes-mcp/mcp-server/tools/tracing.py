@@ -0,0 +1,193 @@
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from tools import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# The span of the tool call or SDK call being executed. Propagated to executor
+# threads by tools.executors and submit_in_context so SDK spans are linked to
+# their tool span.
+current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation: a tool invocation or an outbound OCI SDK call."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start", "duration_ms", "attributes", "error")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration_ms = 0.0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class FileSpanExporter:
+    """Appends finished spans to a local file as JSON lines."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+
+@functools.lru_cache(maxsize=None)
+def get_exporter() -> Optional[FileSpanExporter]:
+    """Return the span exporter for TRACE_EXPORT_PATH, or None when tracing to a file is disabled."""
+    path = os.environ.get("TRACE_EXPORT_PATH")
+    if not path:
+        return None
+    logger.info(f"Exporting trace spans to {path}")
+    return FileSpanExporter(path)
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str, **attributes) -> Iterator[Span]:
+    """
+    Time a block as a span, recording its latency histogram and call and error
+    counters under "<kind>.<name>" and exporting it if an exporter is configured.
+
+    Args:
+        name (str): Operation name, e.g. a tool name or "nosql.query"
+        kind (str): "tool" or "oci"
+    """
+    current = Span(name, kind, current_span.get())
+    current.attributes.update(attributes)
+    token = current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.error = f"{type(e).__name__}: {e}"
+        status = getattr(e, "status", None)
+        metrics.increment(f"{kind}.{name}.errors")
+        if status is not None:
+            metrics.increment(f"{kind}.{name}.errors.{status}")
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000
+        current_span.reset(token)
+        metrics.increment(f"{kind}.{name}.calls")
+        metrics.observe(f"{kind}.{name}.latency_ms", current.duration_ms)
+        for key in ("request_bytes", "response_bytes"):
+            if key in current.attributes:
+                metrics.observe(f"{kind}.{name}.{key}", current.attributes[key], metrics.SIZE_BUCKETS_BYTES)
+        exporter = get_exporter()
+        if exporter is not None:
+            exporter.export(current)
+
+
+def submit_in_context(executor: Executor, func: Callable[..., Any], *args, **kwargs) -> Future:
+    """Submit func to a thread pool in a copy of the caller's context, so its spans keep their parent."""
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+def payload_size(value: Any) -> int:
+    """Approximate the serialized size in bytes of SDK request arguments without serializing them."""
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (bool, int, float)):
+        return 8
+    if isinstance(value, dict):
+        return sum(len(str(key)) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(payload_size(item) for item in value)
+    attribute_map = getattr(value, "attribute_map", None)
+    if attribute_map:
+        return sum(len(key) + payload_size(getattr(value, attribute, None)) for attribute, key in attribute_map.items())
+    return len(str(value))
+
+
+def response_size(response: Any) -> Optional[int]:
+    """Return the Content-Length of an SDK response, if the service sent one."""
+    headers = getattr(response, "headers", None)
+    try:
+        length = headers.get("content-length") if headers is not None else None
+        return int(length) if length is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class InstrumentedClient:
+    """
+    Proxy around an OCI SDK client that records a span for every method call,
+    with latency, request and response size and errors by status code.
+    """
+
+    def __init__(self, client: Any, downstream: str):
+        self._client = client
+        self._downstream = downstream
+
+    def __getattr__(self, attribute: str) -> Any:
+        value = getattr(self._client, attribute)
+        if attribute.startswith("_") or not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def call(*args, **kwargs):
+            with span(f"{self._downstream}.{attribute}", "oci") as current:
+                current.attributes["request_bytes"] = payload_size(args) + payload_size(kwargs)
+                response = value(*args, **kwargs)
+                size = response_size(response)
+                if size is not None:
+                    current.attributes["response_bytes"] = size
+                status = getattr(response, "status", None)
+                if status is not None:
+                    current.attributes["status"] = status
+                return response
+        return call
+
+
+def instrument_client(client: Any, downstream: str) -> Any:
+    """Wrap an OCI SDK client so its calls are traced, unless TRACING_ENABLED is false."""
+    if os.environ.get("TRACING_ENABLED", "true").lower() != "true":
+        return client
+    return InstrumentedClient(client, downstream)
+
+
+def content_size(result: Any) -> int:
+    """Return the total text length of a tool result's content blocks."""
+    content = getattr(result, "content", result)
+    if not isinstance(content, (list, tuple)):
+        return 0
+    return sum(len(getattr(block, "text", "") or "") for block in content)